@@ -1,26 +1,222 @@
 # climrr_intent_parser/__init__.py
 
-from .parsing.intent_processor import (
-    process_query_with_clarification,
-    parse_raw_intent,
-    extract_relevant_data,
-)
-
-from .utils.constants import (
-    FULL_KEY_MAP,
-    get_final_data_key,
-)
-
-from .templater import (
-    separate_vars_and_exprs,
-)
-
-__all__ = [
-    "process_query_with_clarification",
-    "parse_raw_intent",
-    "extract_relevant_data",
-    "FULL_KEY_MAP",
-    "get_final_data_key",
-    "separate_vars_and_exprs",
-]
+# Public names are resolved lazily (PEP 562): importing the package loads no
+# submodule, and each name imports its module on first access.
+from importlib import import_module
 
+TYPE_CHECKING = False  # same effect as typing.TYPE_CHECKING, without importing typing
+
+_LAZY_MODULES = {
+    ".parsing.intent_processor": (
+        "process_query_with_clarification",
+        "parse_raw_intent",
+        "extract_relevant_data",
+        "parse_intent",
+        "extract_items",
+    ),
+    ".parsing.models": (
+        "Intent",
+        "ExtractedItem",
+        "Extraction",
+        "MatchType",
+        "ScenarioCues",
+    ),
+    ".parsing.matcher": (
+        "IntentMatcher",
+        "get_default_matcher",
+        "reset_default_matcher",
+    ),
+    ".parsing.cache": (
+        "IntentCache",
+        "normalize_query",
+    ),
+    ".parsing.clarification": (
+        "catalogue_options",
+        "clarification_options",
+    ),
+    ".parsing.results": (
+        "ClimrrResults",
+    ),
+    ".parsing.batch": (
+        "parse_intents_batch",
+        "extract_relevant_data_batch",
+        "process_queries_batch",
+    ),
+    ".parsing.replay": (
+        "replay_queries",
+        "replay_jsonl",
+    ),
+    ".parsing.session": (
+        "ClarificationSession",
+        "ClarificationSessionManager",
+        "merge_intent",
+    ),
+    ".parsing.incremental": (
+        "IncrementalIntentParser",
+        "SlotUpdate",
+        "parse_stream",
+    ),
+    ".parsing.instrumentation": (
+        "Observer",
+        "StatsObserver",
+        "set_observer",
+        "get_observer",
+        "observing",
+    ),
+    ".parsing.fallback": (
+        "FallbackPolicy",
+        "FallbackView",
+        "json_default",
+    ),
+    ".parsing.ingest": (
+        "load_results",
+        "extract_relevant_data_json",
+    ),
+    ".parsing.compare": (
+        "ComparisonMatrix",
+        "compare_locations",
+    ),
+    ".utils.constants": (
+        "FULL_KEY_MAP",
+        "get_final_data_key",
+    ),
+    ".utils.key_index": (
+        "KeyIndex",
+        "get_key_index",
+        "available_scenarios",
+        "available_seasons",
+        "available_variables",
+        "key_for_column",
+    ),
+    ".utils.columnar": (
+        "ColumnarStore",
+        "build_columnar_cache",
+        "load_columnar",
+    ),
+    ".templater": (
+        "separate_vars_and_exprs",
+        "CompiledTemplate",
+        "compile_template",
+        "register_template",
+        "get_template",
+        "render_table",
+    ),
+}
+
+_EXPORTS = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+_SUBMODULES = ("parsing", "utils", "templater")
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is not None:
+        value = getattr(import_module(module, __name__), name)
+    elif name in _SUBMODULES:
+        value = import_module("." + name, __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .parsing.intent_processor import (
+        process_query_with_clarification,
+        parse_raw_intent,
+        extract_relevant_data,
+        parse_intent,
+        extract_items,
+    )
+    from .parsing.models import (
+        Intent,
+        ExtractedItem,
+        Extraction,
+        MatchType,
+        ScenarioCues,
+    )
+    from .parsing.matcher import (
+        IntentMatcher,
+        get_default_matcher,
+        reset_default_matcher,
+    )
+    from .parsing.cache import (
+        IntentCache,
+        normalize_query,
+    )
+    from .parsing.clarification import (
+        catalogue_options,
+        clarification_options,
+    )
+    from .parsing.results import (
+        ClimrrResults,
+    )
+    from .parsing.batch import (
+        parse_intents_batch,
+        extract_relevant_data_batch,
+        process_queries_batch,
+    )
+    from .parsing.replay import (
+        replay_queries,
+        replay_jsonl,
+    )
+    from .parsing.session import (
+        ClarificationSession,
+        ClarificationSessionManager,
+        merge_intent,
+    )
+    from .parsing.incremental import (
+        IncrementalIntentParser,
+        SlotUpdate,
+        parse_stream,
+    )
+    from .parsing.instrumentation import (
+        Observer,
+        StatsObserver,
+        set_observer,
+        get_observer,
+        observing,
+    )
+    from .parsing.fallback import (
+        FallbackPolicy,
+        FallbackView,
+        json_default,
+    )
+    from .parsing.ingest import (
+        load_results,
+        extract_relevant_data_json,
+    )
+    from .parsing.compare import (
+        ComparisonMatrix,
+        compare_locations,
+    )
+    from .utils.constants import (
+        FULL_KEY_MAP,
+        get_final_data_key,
+    )
+    from .utils.key_index import (
+        KeyIndex,
+        get_key_index,
+        available_scenarios,
+        available_seasons,
+        available_variables,
+        key_for_column,
+    )
+    from .utils.columnar import (
+        ColumnarStore,
+        build_columnar_cache,
+        load_columnar,
+    )
+    from .templater import (
+        separate_vars_and_exprs,
+        CompiledTemplate,
+        compile_template,
+        register_template,
+        get_template,
+        render_table,
+    )
@@ -0,0 +1,50 @@
+"""
+Throughput of the batch entry points against a Python loop over the single-query functions.
+
+    python benchmarks/bench_batch.py [n_queries]
+"""
+import sys
+import time
+
+from climrr_intent_parser import (
+    parse_raw_intent,
+    parse_intents_batch,
+    process_query_with_clarification,
+    process_queries_batch,
+)
+
+import reference
+from corpus import make_payload, make_queries
+
+
+def _qps(fn, n):
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    # Logged traffic repeats itself; draw from a smaller pool of distinct questions
+    pool = make_queries(max(1, n // 4))
+    queries = [pool[i % len(pool)] for i in range(n)]
+    payload = make_payload(200)
+
+    assert list(parse_intents_batch(queries)) == [parse_raw_intent(q.lower()) for q in queries]
+    assert list(process_queries_batch(queries, payload)) == [
+        process_query_with_clarification(q, payload) for q in queries
+    ]
+
+    rows = [
+        ("parse: original loop", lambda: [reference.parse_raw_intent(q.lower()) for q in queries]),
+        ("parse: parse_intents_batch", lambda: list(parse_intents_batch(queries))),
+        ("process: original loop", lambda: [reference.process_query_with_clarification(q, payload) for q in queries]),
+        ("process: process_queries_batch", lambda: list(process_queries_batch(queries, payload))),
+    ]
+    print(f"queries: {n} ({len(pool)} distinct)")
+    for label, fn in rows:
+        print(f"{label:<34} {_qps(fn, n):>12,.0f} queries/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+A synthetic FullData.csv loaded as per-row dicts (csv.DictReader) against the
+memory-mapped columnar cache: load time, Python heap retained and lookup cost.
+
+    python benchmarks/bench_columnar.py [n_locations]
+"""
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from climrr_intent_parser import build_columnar_cache, load_columnar, parse_intent
+from climrr_intent_parser.utils.columnar import DEFAULT_LOCATION_COLUMN, data_columns
+
+from corpus import make_queries
+
+
+def write_csv(path, n_locations, seed=0):
+    rng = random.Random(seed)
+    columns = data_columns()
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([DEFAULT_LOCATION_COLUMN] + columns)
+        for i in range(n_locations):
+            writer.writerow([f"R{i:06d}"] + [f"{rng.uniform(-20, 120):.3f}" for _ in columns])
+
+
+def _measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = build()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return kept, elapsed, retained, peak
+
+
+def main():
+    n_locations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "FullData.csv")
+        cache_dir = os.path.join(tmp, "columnar")
+        write_csv(csv_path, n_locations)
+        start = time.perf_counter()
+        build_columnar_cache(csv_path, cache_dir)
+        print(f"cache build (once): {time.perf_counter() - start:.2f} s for {n_locations} locations")
+
+        def load_rows():
+            with open(csv_path, newline="") as f:
+                return {row[DEFAULT_LOCATION_COLUMN]: row for row in csv.DictReader(f)}
+
+        rows, rows_s, rows_mem, rows_peak = _measure(load_rows)
+        store, store_s, store_mem, store_peak = _measure(lambda: load_columnar(csv_path, cache_dir))
+        print(f"{'loader':<12} {'load s':>8} {'retained MB':>12} {'peak MB':>9}")
+        print(f"{'DictReader':<12} {rows_s:>8.3f} {rows_mem / 1e6:>12.1f} {rows_peak / 1e6:>9.1f}")
+        print(f"{'columnar':<12} {store_s:>8.3f} {store_mem / 1e6:>12.1f} {store_peak / 1e6:>9.1f}")
+
+        rng = random.Random(1)
+        intents = [parse_intent(q.lower()) for q in make_queries(2000)]
+        intents = [i for i in intents if i.variable]
+        pairs = [(f"R{rng.randrange(n_locations):06d}", i) for i in intents]
+        start = time.perf_counter()
+        for location, intent in pairs:
+            store.lookup(location, intent)
+        per_lookup = (time.perf_counter() - start) / len(pairs)
+        print(f"lookup(location, intent): {per_lookup * 1e6:.2f} us")
+        del rows
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Multi-location scenario comparison: a per-location loop of extract_items (payloads) or
+ColumnarStore.value (columnar cache), against one compare_locations call returning the
+locations × scenarios × subtypes matrix and its deltas against Historical, as nested
+lists and (with NumPy installed) as arrays with vectorize=True.
+
+    python benchmarks/bench_compare.py [n_locations]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from climrr_intent_parser import ColumnarStore, build_columnar_cache, compare_locations, extract_items, parse_intent
+from climrr_intent_parser.utils.arrays import load_numpy
+from climrr_intent_parser.utils.constants import FWI_CONFIGS, FWI_VARIABLE
+
+from bench_columnar import write_csv
+from corpus import make_payload
+
+QUERIES = [
+    "compare end-century rcp8.5 vs historical summer max temp",
+    "fire weather index 2050 rcp 4.5 compared to historical",
+    "annual precipitation mid-century rcp 8.5",
+]
+
+
+def _best(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def payload_loop(query, payloads):
+    # One extract_items call per location (plus one for the Historical baseline)
+    rows = []
+    for location in payloads:
+        items = extract_items(query, [location]).items
+        baseline = {i.variable: i.value for i in extract_items("historical " + query, [location]).items
+                    if i.scenario == "Historical"}
+        rows.append([(i.value, i.value - baseline[i.variable] if i.variable in baseline else None) for i in items])
+    return rows
+
+
+def columnar_loop(store, intent, scenarios):
+    # One ColumnarStore.value call per location, scenario and subtype
+    season = intent.season or "Annual"
+    suffixes = [c["suffix"] for c in FWI_CONFIGS] if intent.variable == FWI_VARIABLE else [""]
+    rows = []
+    for location in store.locations:
+        row = []
+        for suffix in suffixes:
+            base = store.value(location, intent.variable, season, "Historical", suffix)
+            for scenario in scenarios:
+                value = store.value(location, intent.variable, season, scenario, suffix)
+                row.append((value, None if value is None or base is None else value - base))
+        rows.append(row)
+    return rows
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    payloads = [dict(make_payload(0, seed=i)[0], location=f"R{i:06d}") for i in range(n)]
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "FullData.csv")
+        cache_dir = os.path.join(tmp, "columnar")
+        write_csv(csv_path, n)
+        build_columnar_cache(csv_path, cache_dir)
+        store = ColumnarStore(cache_dir)
+
+        vectorize = [False, True] if load_numpy() is not None else [False]
+        print(f"{n} locations")
+        print(f"{'query':<58} {'source':<9} {'output':<7} {'loop ms':>9} {'matrix ms':>10} {'speedup':>8}")
+        for query in QUERIES:
+            intent = parse_intent(query.lower())
+            scenarios = compare_locations(query, store).scenarios
+            for source, loop, data in (
+                ("payloads", lambda: payload_loop(query, payloads), payloads),
+                ("columnar", lambda: columnar_loop(store, intent, scenarios), store),
+            ):
+                loop_s = _best(loop)
+                for vec in vectorize:
+                    matrix_s = _best(lambda: compare_locations(query, data, vectorize=vec))
+                    print(f"{query:<58} {source:<9} {'arrays' if vec else 'lists':<7} {loop_s * 1e3:>9.1f} "
+                          f"{matrix_s * 1e3:>10.1f} {loop_s / matrix_s:>7.1f}x")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
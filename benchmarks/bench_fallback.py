@@ -0,0 +1,52 @@
+"""
+Size of fallback responses: the full input_data against a trimmed FallbackView, for the
+corpus queries that fall back, in serialized JSON bytes and a rough prompt-token count.
+
+    python benchmarks/bench_fallback.py [n_queries] [n_variables]
+"""
+import json
+import sys
+import time
+
+from climrr_intent_parser import FallbackPolicy, json_default, process_query_with_clarification
+
+from corpus import make_payload, make_queries
+
+
+def _tokens(n_bytes):
+    # Rough prompt-token estimate (about four characters per token)
+    return n_bytes // 4
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_variables = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    payload = make_payload(n_variables)
+    policy = FallbackPolicy()
+
+    full_bytes = trimmed_bytes = fallbacks = 0
+    full_time = trimmed_time = 0.0
+    for query in make_queries(n):
+        start = time.perf_counter()
+        full = json.dumps(process_query_with_clarification(query, payload, 2))
+        full_time += time.perf_counter() - start
+        start = time.perf_counter()
+        response = process_query_with_clarification(query, payload, 2, fallback=policy)
+        trimmed = json.dumps(response, default=json_default)
+        trimmed_time += time.perf_counter() - start
+        if response["status"] == "fallback":
+            fallbacks += 1
+            full_bytes += len(full)
+            trimmed_bytes += len(trimmed)
+
+    print(f"fallback responses: {fallbacks} of {n} queries, payload with {n_variables} variables")
+    print(f"{'':<10} {'bytes/response':>15} {'~tokens':>9} {'ms/query (incl. json)':>22}")
+    print(f"{'full':<10} {full_bytes / fallbacks:>15,.0f} {_tokens(full_bytes // fallbacks):>9,} "
+          f"{full_time / n * 1e3:>22.3f}")
+    print(f"{'trimmed':<10} {trimmed_bytes / fallbacks:>15,.0f} {_tokens(trimmed_bytes // fallbacks):>9,} "
+          f"{trimmed_time / n * 1e3:>22.3f}")
+    print(f"reduction: {full_bytes / trimmed_bytes:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
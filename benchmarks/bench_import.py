@@ -0,0 +1,61 @@
+"""
+Cold-import cost per entry point, from `python -X importtime` in a fresh interpreter.
+
+Reports the summed self time of every module an import statement loads beyond a bare
+interpreter start (best of several runs), and how many such modules there are.
+
+    python benchmarks/bench_import.py [runs]
+"""
+import subprocess
+import sys
+
+ENTRY_POINTS = [
+    "import climrr_intent_parser",
+    "from climrr_intent_parser import FULL_KEY_MAP",
+    "from climrr_intent_parser import parse_raw_intent",
+    "from climrr_intent_parser import process_query_with_clarification",
+    "from climrr_intent_parser import separate_vars_and_exprs",
+    "from climrr_intent_parser import render_table",
+    "from climrr_intent_parser import ClarificationSessionManager",
+    "from climrr_intent_parser import replay_jsonl",
+    "import climrr_intent_parser.parsing.intent_processor",
+]
+
+
+def _import_times(statement):
+    # {module: self time in us} for everything imported while running the statement
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    ).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(self_us)
+    return times
+
+
+def cold_import(statement, runs):
+    baseline = set(_import_times("pass"))
+    best, modules = float("inf"), 0
+    for _ in range(runs):
+        times = _import_times(statement)
+        extra = {name: us for name, us in times.items() if name not in baseline}
+        if sum(extra.values()) < best:
+            best, modules = sum(extra.values()), len(extra)
+    return best, modules
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    _import_times("import climrr_intent_parser.parsing.intent_processor")  # write bytecode caches first
+    print(f"{'entry point':<68} {'ms':>7} {'modules':>8}")
+    for statement in ENTRY_POINTS:
+        us, modules = cold_import(statement, runs)
+        print(f"{statement:<68} {us / 1e3:>7.2f} {modules:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Raw-bytes ingestion: json.loads of the whole ClimRR payload followed by
+extract_relevant_data, against extract_relevant_data_json, which decodes only the
+variable blocks each query needs (and the full payload only when it falls back).
+Reported over all corpus queries and over the answered ones alone. Randomly nested
+documents are checked against json.loads first.
+
+    python benchmarks/bench_ingest.py [n_queries] [n_variables ...]
+"""
+import json
+import random
+import sys
+import time
+
+from climrr_intent_parser import extract_relevant_data, extract_relevant_data_json
+from climrr_intent_parser.parsing import ingest
+from climrr_intent_parser.parsing.results import ClimrrResults
+
+from corpus import make_payload, make_queries
+
+# Member names and scalars for the random documents: case variants of one key and a
+# nested "results". Rarer strings holding brackets, quotes or non-ASCII text send
+# load_results from its str.find scan to the exact member walker.
+FUZZ_NAMES = ["Wind Speed", "wind speed", "WIND SPEED", "results", "Other", "Notes"]
+FUZZ_SCALARS = [1, -2.5e3, True, None, "s", "Wind Speed", "results"]
+FUZZ_RARE = ["{[", "]}", "Caf\u00e9", 'say "hi"', "Notes\\"]
+FUZZ_KEYS = [["Wind Speed"], ["wind speed", "Other"], ["Notes"], ["other", "Notes"], ["results"], ["caf\u00e9"]]
+
+
+def _fuzz_string(rng, choices):
+    if rng.random() < 0.005:
+        return json.dumps(rng.choice(FUZZ_RARE), ensure_ascii=rng.random() < 0.5)
+    return json.dumps(rng.choice(choices))
+
+
+def _fuzz_value(rng, depth):
+    r = rng.random()
+    if depth > 3 or r < 0.3:
+        return _fuzz_string(rng, FUZZ_SCALARS)
+    if r < 0.45:
+        return "[" + ", ".join(_fuzz_value(rng, depth + 1) for _ in range(rng.randint(0, 3))) + "]"
+    return _fuzz_object(rng, depth + 1)
+
+
+def _fuzz_object(rng, depth):
+    members = (f"{_fuzz_string(rng, FUZZ_NAMES)} : {_fuzz_value(rng, depth)}"
+               for _ in range(rng.randint(0, 5)))
+    return "{" + ",\n ".join(members) + "}"
+
+
+def make_fuzz_payload(rng):
+    """
+    Raw JSON text of a random location array whose first location has a `results`
+    member, sometimes repeated or preceded and followed by other nested members.
+    """
+    first = '{"results": ' + _fuzz_object(rng, 0) + "}"
+    if rng.random() < 0.4:
+        repeated = ', "results": ' + _fuzz_object(rng, 0) if rng.random() < 0.5 else ""
+        first = ('{"a": ' + _fuzz_object(rng, 0) + ', "results": ' + _fuzz_value(rng, 0)
+                 + ', "extra": ' + _fuzz_object(rng, 0) + repeated + "}")
+    return "[" + ", ".join([first] + [_fuzz_object(rng, 0) for _ in range(rng.randint(0, 2))]) + "]"
+
+
+def _load_results_reference(raw, keys):
+    # What load_results must return, from a full decode
+    data = json.loads(raw)
+    results = ClimrrResults.from_input(data)
+    if not isinstance(results.results, dict):
+        return None
+    out = {}
+    for key in keys:
+        actual = results.resolve_key(key)
+        if actual is None:
+            return None
+        out[actual] = results.results[actual]
+    return [{"results": out}]
+
+
+def check_load_results(n_documents=2000, seed=0):
+    """
+    Runs load_results on random documents and compares each answer with a full
+    json.loads. Returns the number of mismatching documents.
+    """
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(n_documents):
+        raw = make_fuzz_payload(rng)
+        keys = rng.choice(FUZZ_KEYS)
+        expected = _outcome(lambda: _load_results_reference(raw, keys))
+        if _outcome(lambda: ingest.load_results(raw, keys)) != expected:
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"    load_results mismatch for {keys}: {raw[:200]!r}")
+    return mismatches
+
+
+def _outcome(fn):
+    # The return value, or the exception type when the call fails
+    try:
+        return fn()
+    except Exception as e:
+        return type(e)
+
+
+def _time(fn, queries, raw):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query, raw)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    sizes = [int(a) for a in sys.argv[2:]] or [50, 200, 1000]
+    assert check_load_results() == 0
+    queries = make_queries(n)
+
+    def full(query, raw):
+        return extract_relevant_data(query, json.loads(raw), "")
+
+    print(f"full-decode backend: {'orjson' if ingest.orjson is not None else 'json'}")
+    print(f"{'variables':>9} {'payload KB':>11} {'queries':>9} {'json.loads ms':>14} "
+          f"{'selective ms':>13} {'speedup':>8}")
+    for n_variables in sizes:
+        raw = json.dumps(make_payload(n_variables)).encode()
+        answered = []
+        for query in queries:
+            expected = full(query, raw)
+            assert expected == extract_relevant_data_json(query, raw), query
+            if isinstance(expected, dict):
+                answered.append(query)
+        for label, subset in (("all", queries), ("answered", answered)):
+            baseline = _time(full, subset, raw)
+            selective = _time(extract_relevant_data_json, subset, raw)
+            print(f"{n_variables:>9} {len(raw) / 1024:>11,.0f} {label:>9} {baseline * 1e3:>14.3f} "
+                  f"{selective * 1e3:>13.3f} {baseline / selective:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
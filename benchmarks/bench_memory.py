@@ -0,0 +1,44 @@
+"""
+Bytes retained per parsed query / extracted item: dicts against Intent / ExtractedItem.
+
+    python benchmarks/bench_memory.py [n_queries]
+"""
+import sys
+import tracemalloc
+
+from climrr_intent_parser import extract_items, parse_intent
+
+from corpus import make_payload, make_queries
+
+
+def _bytes_per_item(build, n):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del kept
+    return size / n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    queries = [q.lower() for q in make_queries(n)]
+    payload = make_payload()
+    intents = [parse_intent(q) for q in queries]
+    extractions = [extract_items(q, payload, intent) for q, intent in zip(queries, intents)]
+    n_items = sum(len(e.items) for e in extractions)
+
+    rows = [
+        ("intent as dict", lambda: [i.to_dict() for i in intents], n),
+        ("intent as Intent", lambda: [parse_intent(q) for q in queries], n),
+        ("extracted item as dict", lambda: [item.to_dict() for e in extractions for item in e.items], n_items),
+        ("extracted item as ExtractedItem", lambda: [item._replace() for e in extractions for item in e.items], n_items),
+    ]
+    for label, build, count in rows:
+        print(f"{label:<33} {_bytes_per_item(build, count):8.1f} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Micro-benchmark: per-query parse_raw_intent time, original implementation vs IntentMatcher.
+
+    python benchmarks/bench_parse.py [n_queries]
+"""
+import sys
+import time
+
+from climrr_intent_parser import IntentMatcher, parse_raw_intent
+
+import reference
+from corpus import make_queries
+
+
+def _time_per_query(fn, queries, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for q in queries:
+            fn(q)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    queries = [q.lower() for q in make_queries(n)]
+    matcher = IntentMatcher()
+
+    before = _time_per_query(reference.parse_raw_intent, queries)
+    after = _time_per_query(lambda q: parse_raw_intent(q, matcher), queries)
+
+    print(f"queries:             {n}")
+    print(f"original:            {before * 1e6:8.2f} us/query")
+    print(f"IntentMatcher:       {after * 1e6:8.2f} us/query")
+    print(f"speedup:             {before / after:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
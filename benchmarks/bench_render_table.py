@@ -0,0 +1,96 @@
+"""
+Rendering one answer template for every location of a column table: regex substitution
+and render() loops over row dicts against render_table. Edge cases (int overflow,
+comments in expressions, values render() rejects) are checked against render() first.
+
+    python benchmarks/bench_render_table.py [n_rows]
+"""
+import random
+import sys
+import time
+
+from climrr_intent_parser.templater import compile_template, render_table
+
+from bench_templater import TEMPLATE, render_with_regex
+
+
+# (template, table) pairs where column-wise evaluation is easy to get wrong
+EDGE_CASES = [
+    ("{{a * b}}", {"a": [10 ** 10, 3], "b": [10 ** 10, 4]}),
+    ("{{a ** 64 + b}}", {"a": [2, 3], "b": [1, 2]}),
+    ("{{a ** 70}}", {"a": [2, 3]}),
+    ("{{abs(a)}}", {"a": [-2 ** 63, -5]}),
+    ("{{int(a) + 1}}", {"a": [1e20, 2.5]}),
+    ("{{a * b}}", {"a": [1e200, 1.5], "b": [1e200, 2.0]}),
+    ("{{a + b}}", {"a": [1, 2.5], "b": [2, 3]}),
+    ("{{a # note}}", {"a": [1.5, 2.5]}),
+    ("{{float(a)}}", {"a": [None, 1.0]}),
+]
+
+
+def _outcome(fn):
+    # The rendered rows, or the exception type when rendering fails
+    try:
+        return fn()
+    except Exception as e:
+        return type(e)
+
+
+def check_render_table():
+    """
+    Renders every edge case with render_table and render() per row; both must give
+    the same rows or raise the same exception type. Returns the number of mismatching cases.
+    """
+    mismatches = 0
+    for text, table in EDGE_CASES:
+        template = compile_template(text)
+        names = list(table)
+        expected = _outcome(lambda: [template.render(dict(zip(names, row))) for row in zip(*table.values())])
+        if _outcome(lambda: list(render_table(template, table))) != expected:
+            mismatches += 1
+            print(f"    render_table mismatch: {text!r}")
+    return mismatches
+
+
+def make_table(n_rows, seed=0):
+    rng = random.Random(seed)
+    return {
+        "Location": [f"Grid cell {i}" for i in range(n_rows)],
+        "precipann_hist": [round(rng.uniform(5, 80), 2) for _ in range(n_rows)],
+        "precipann_rcp85_midc": [round(rng.uniform(5, 80), 2) for _ in range(n_rows)],
+    }
+
+
+def _seconds(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 60000
+    assert check_render_table() == 0
+    table = make_table(n_rows)
+    template = compile_template(TEMPLATE)
+
+    def row_loop():
+        names = list(table)
+        return [template.render(dict(zip(names, row))) for row in zip(*table.values())]
+
+    expected = row_loop()
+    def regex_loop():
+        names = list(table)
+        return [render_with_regex(TEMPLATE, dict(zip(names, row))) for row in zip(*table.values())]
+
+    rows = [("regex substitution per row", regex_loop),
+            ("render() per row", row_loop),
+            ("render_table", lambda: list(render_table(template, table)))]
+
+    print(f"rows: {n_rows}")
+    for label, fn in rows:
+        assert fn() == expected
+        print(f"{label:<28} {_seconds(fn):7.3f} s")
+
+
+if __name__ == "__main__":
+    main()
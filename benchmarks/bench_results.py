@@ -0,0 +1,45 @@
+"""
+extract_relevant_data on payloads with hundreds of variables: the original linear key
+scan against a ClimrrResults index reused across turns.
+
+    python benchmarks/bench_results.py
+"""
+import time
+
+from climrr_intent_parser import ClimrrResults, extract_relevant_data, parse_raw_intent
+
+import reference
+from corpus import make_payload
+
+QUERIES = [
+    "compare fire weather index in summer end century rcp 8.5 vs historical",
+    "summer max temp 2050 rcp 8.5",
+    "annual precipitation historical",
+    "wind speed mid-century rcp 4.5 compared to the past",
+]
+
+
+def _time_per_call(fn, repeat=2000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    print(f"{'variables':>9} {'original us':>12} {'index (fresh) us':>17} {'index (reused) us':>18}  query")
+    for n_variables in (50, 200, 800):
+        payload = make_payload(n_variables)
+        results = ClimrrResults.from_input(payload)
+        for query in QUERIES:
+            intent = parse_raw_intent(query.lower())
+            assert reference.extract_relevant_data(query, payload, "") == extract_relevant_data(
+                query, payload, "", intent=intent, results=results)
+            original = _time_per_call(lambda: reference.extract_relevant_data(query, payload, ""))
+            fresh = _time_per_call(lambda: extract_relevant_data(query, payload, "", intent=intent))
+            reused = _time_per_call(lambda: extract_relevant_data(query, payload, "", intent=intent, results=results))
+            print(f"{n_variables:>9} {original * 1e6:>12.1f} {fresh * 1e6:>17.1f} {reused * 1e6:>18.1f}  {query}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Rendering a Q&A template: regex substitution + eval per render against CompiledTemplate.
+
+    python benchmarks/bench_templater.py
+"""
+import re
+import time
+
+from climrr_intent_parser.templater import compile_template
+
+TEMPLATE = (
+    "Q: How will annual precipitation change in {Location} by mid-century under RCP8.5?\n"
+    "A: Annual precipitation in {Location} is projected to go from {precipann_hist} in "
+    "historically to {precipann_rcp85_midc} in, a change of "
+    "{{round(precipann_rcp85_midc - precipann_hist, 2)}} in "
+    "({expr: round(100 * (precipann_rcp85_midc - precipann_hist) / precipann_hist, 1)}%)."
+)
+VALUES = {"Location": "Cook County, IL", "precipann_hist": 37.84, "precipann_rcp85_midc": 40.12}
+
+_VAR_RE = re.compile(r'\{([a-zA-Z0-9_~]+)\}')
+_EXPR_RE = re.compile(r'\{\{(.+?)\}\}|\{expr:([^}]+)\}')
+
+
+def render_with_regex(text, values):
+    text = _EXPR_RE.sub(lambda m: str(eval((m.group(1) or m.group(2)).strip(), {"round": round}, values)), text)
+    return _VAR_RE.sub(lambda m: str(values[m.group(1)]), text)
+
+
+def _time_per_render(fn, repeat=20000):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    template = compile_template(TEMPLATE)
+    assert template.render(VALUES) == render_with_regex(TEMPLATE, VALUES)
+
+    regex = _time_per_render(lambda: render_with_regex(TEMPLATE, VALUES))
+    compiled = _time_per_render(lambda: template.render(VALUES))
+    print(f"regex substitution + eval: {regex * 1e6:8.2f} us/render")
+    print(f"CompiledTemplate.render:   {compiled * 1e6:8.2f} us/render")
+    print(f"speedup:                   {regex / compiled:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Parse time as the variable vocabulary grows.
+
+Compares the single-pass IntentMatcher scanner against a per-token substring scan
+over the same vocabulary, for key maps padded with synthetic variable names.
+
+    python benchmarks/bench_vocab_scaling.py
+"""
+import random
+import time
+
+from climrr_intent_parser import FULL_KEY_MAP, IntentMatcher
+
+from corpus import make_queries
+
+_WORDS = [
+    "soil", "moisture", "snow", "cover", "humidity", "relative", "storm", "surge", "flood",
+    "depth", "drought", "severity", "frost", "free", "growing", "season", "length", "ice",
+    "coastal", "river", "streamflow", "solar", "radiation", "cloud", "fraction", "vapor",
+]
+
+
+def padded_key_map(factor: int, seed: int = 0):
+    rng = random.Random(seed)
+    key_map = dict(FULL_KEY_MAP)
+    n_vars = len(set(k[0] for k in FULL_KEY_MAP)) * (factor - 1)
+    for i in range(n_vars):
+        name = " ".join(rng.sample(_WORDS, 3)).title() + f" {i}"
+        key_map[(name, "Annual", "Historical")] = f"synthetic_{i}_hist"
+    return key_map
+
+
+def _time_per_query(fn, queries, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for q in queries:
+            fn(q)
+        best = min(best, time.perf_counter() - start)
+    return best / len(queries)
+
+
+def main():
+    queries = [q.lower() for q in make_queries(2000)]
+    print(f"{'factor':>6} {'variables':>9} {'per-token us':>13} {'single-pass us':>15}")
+    for factor in (1, 10, 100):
+        matcher = IntentMatcher(padded_key_map(factor))
+        vocab = [v.lower() for v in matcher.variables]
+
+        def per_token(q):
+            for v in vocab:
+                if v in q:
+                    return v
+            return None
+
+        linear = _time_per_query(per_token, queries)
+        single = _time_per_query(matcher.parse, queries)
+        print(f"{factor:>6} {len(vocab):>9} {linear * 1e6:>13.2f} {single * 1e6:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
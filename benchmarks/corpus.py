@@ -0,0 +1,104 @@
+"""
+Reproducible synthetic query corpora built from the FULL_KEY_MAP vocabulary.
+"""
+import random
+from typing import List
+
+from climrr_intent_parser.utils.constants import FULL_KEY_MAP
+
+NOISE_WORDS = [
+    "what", "is", "the", "for", "my", "county", "in", "will", "be", "how", "much",
+    "change", "expected", "average", "show", "me", "please", "data", "location", "near",
+]
+
+PHRASES = [
+    "max temp", "min temp", "avg max temp", "average minimum temp", "heat index", "rain",
+    "precip", "dry days", "days without rain", "wind", "fire weather", "fwi class",
+    "fwi 95th percentile", "high", "low", "temperature",
+]
+
+SCENARIO_PHRASES = [
+    "", "rcp 8.5", "rcp 4.5", "2050", "2100", "mid-century", "end of century",
+    "historical", "in the past", "compared to historical", "projected",
+]
+
+SEASON_PHRASES = ["", "summer", "winter", "spring", "autumn", "annual"]
+
+
+def make_queries(n: int, seed: int = 0) -> List[str]:
+    """
+    Returns n mixed-case queries combining a variable phrase, season, scenario and noise words.
+    """
+    rng = random.Random(seed)
+    variables = sorted(set(k[0] for k in FULL_KEY_MAP.keys()))
+    queries = []
+    for _ in range(n):
+        words = rng.sample(NOISE_WORDS, rng.randint(2, 6))
+        words.append(rng.choice(variables) if rng.random() < 0.4 else rng.choice(PHRASES))
+        words.append(rng.choice(SEASON_PHRASES))
+        words.append(rng.choice(SCENARIO_PHRASES))
+        rng.shuffle(words)
+        query = " ".join(w for w in words if w)
+        queries.append(query.upper() if rng.random() < 0.1 else query.capitalize())
+    return queries
+
+
+# Variable names used as keys of the ClimRR API `results` object where they differ from FULL_KEY_MAP
+_JSON_NAMES = {
+    "Average Maximum Temperature": ["Maximum Avg Temperature"],
+    "Average Minimum Temperature": ["Minimum Avg Temperature"],
+    "Fire Weather Index": [
+        "Fire Weather Index (95th Percentile)", "Fire Weather Index Class", "Fire Weather Index (Average)",
+    ],
+}
+
+
+def make_payload(n_variables: int = 0, seed: int = 0) -> list:
+    """
+    Returns an input_data payload ([{"results": {...}}]) holding every FULL_KEY_MAP variable
+    plus enough synthetic variables to reach n_variables blocks, in shuffled key order.
+    """
+    rng = random.Random(seed)
+    names = []
+    for var in dict.fromkeys(k[0] for k in FULL_KEY_MAP.keys()):
+        names.extend(_JSON_NAMES.get(var, [var]))
+    names.extend(f"Synthetic Variable {i}" for i in range(max(0, n_variables - len(names))))
+    rng.shuffle(names)
+
+    def leaf():
+        return {"value": round(rng.uniform(0, 120), 2)}
+
+    results = {}
+    for name in names:
+        results[name] = {
+            season: {
+                "historical": leaf(),
+                "rcp45": {"mid_century": leaf(), "end_century": leaf()},
+                "rcp85": {"mid_century": leaf(), "end_century": leaf()},
+            }
+            for season in ("Annual", "Winter", "Spring", "Summer", "Autumn")
+        }
+    return [{"location": "synthetic", "results": results}]
+
+
+def make_templates(n: int, seed: int = 0) -> List[str]:
+    """
+    Returns n Q&A template texts over FULL_KEY_MAP column names, mixing plain
+    placeholders, {{ expr }} and {expr: ...} expressions.
+    """
+    rng = random.Random(seed)
+    columns = sorted(set(FULL_KEY_MAP.values()))
+    templates = []
+    for _ in range(n):
+        a, b = rng.sample(columns, 2)
+        parts = [
+            f"Q: How will {rng.choice(PHRASES)} change in {{Location}} {rng.choice(SCENARIO_PHRASES)}?",
+            f"A: It goes from {{{a}}} to {{{b}}}",
+        ]
+        if rng.random() < 0.7:
+            parts.append(f"a change of {{{{round({b} - {a}, 2)}}}}")
+        if rng.random() < 0.5:
+            parts.append(f"({{expr: round(100 * ({b} - {a}) / {a}, 1)}}%)")
+        parts.extend(rng.sample(NOISE_WORDS, rng.randint(0, 4)))
+        templates.append(" ".join(parts) + ".")
+    return templates
@@ -0,0 +1,257 @@
+"""
+Benchmark suite and regression harness for the public entry points.
+
+Runs parse_raw_intent, extract_relevant_data, process_query_with_clarification and
+separate_vars_and_exprs over reproducible synthetic corpora and reports latency
+percentiles, throughput and peak traced memory. Before timing, every output is checked
+against the frozen original implementation in reference.py, render_table against
+render() on edge cases, and the selective decoding of raw payloads against json.loads
+on randomly nested documents.
+
+    python benchmarks/run.py --output baseline.json
+    python benchmarks/run.py --compare baseline.json --threshold 0.10
+
+With --compare, the exit status is 1 if any metric is worse than the baseline by more
+than the threshold (a fraction). A failed equivalence check exits with status 2.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from climrr_intent_parser import (
+    ClimrrResults,
+    clarification_options,
+    extract_relevant_data,
+    parse_intent,
+    parse_raw_intent,
+    process_query_with_clarification,
+    separate_vars_and_exprs,
+)
+from climrr_intent_parser.templater import _scan_placeholders
+
+import reference
+from bench_ingest import check_load_results
+from bench_render_table import check_render_table
+from corpus import make_payload, make_queries, make_templates
+
+# metric -> True if a larger value is better
+METRICS = {"p50_us": False, "p90_us": False, "p99_us": False, "throughput_per_s": True, "peak_kib": False}
+
+# case -> function emptying the memo caches a case would otherwise hit on every call
+# after the first pass over its corpus (so each pass times the real work)
+RESETS = {"separate_vars_and_exprs": _scan_placeholders.cache_clear}
+
+# (slot, message cue) for clarification prompts, checked in order
+CLARIFICATION_CUES = [
+    ("ambiguous_variable", "Do you mean"),
+    ("variable", "climate variable"),
+    ("unavailable_season", " has no data for "),
+    ("season", "Which season"),
+    ("scenario", "Which scenario"),
+]
+
+
+def build_cases(n_queries, n_variables, n_templates, seed):
+    """
+    {case name: (package function, reference function, argument tuples)}.
+    """
+    queries = make_queries(n_queries, seed)
+    payload = make_payload(n_variables, seed)
+    templates = make_templates(n_templates, seed)
+    return {
+        "parse_raw_intent": (parse_raw_intent, reference.parse_raw_intent, [(q.lower(),) for q in queries]),
+        "extract_relevant_data": (
+            extract_relevant_data, reference.extract_relevant_data, [(q, payload, "") for q in queries]
+        ),
+        "process_query_with_clarification": (
+            process_query_with_clarification, reference.process_query_with_clarification,
+            [(q, payload, i % 3) for i, q in enumerate(queries)]
+        ),
+        "separate_vars_and_exprs": (
+            separate_vars_and_exprs, reference.separate_vars_and_exprs, [(t,) for t in templates]
+        ),
+    }
+
+
+def _asked_slot(response):
+    if response.get("status") != "clarification_needed":
+        return None
+    message = response.get("message", "")
+    return next((slot for slot, cue in CLARIFICATION_CUES if cue in message), "unknown")
+
+
+def _single_option(args, slot):
+    # Whether the package fills `slot` ("season" or "scenario") instead of asking,
+    # because the catalogue and the payload leave only one option for it
+    intent = parse_intent(args[0].lower())
+    results = ClimrrResults.from_input(args[1])
+    seasons = clarification_options(results, intent.variable)
+    if slot == "season" or len(seasons) == 1:
+        return len(seasons) == 1
+    return len(clarification_options(results, intent.variable, intent.season)) == 1
+
+
+def _equivalent(name, args, new, old):
+    if new == old:
+        return True
+    if name == "parse_raw_intent":
+        # Equal-length exact variable names both present in the query: the original picked
+        # one in set order, the package in FULL_KEY_MAP order
+        return (
+            new["variable_match_type"] == old["variable_match_type"] == "exact"
+            and len(new["variable"]) == len(old["variable"])
+            and new["variable"].lower() in args[0] and old["variable"].lower() in args[0]
+            and {**new, "variable": None} == {**old, "variable": None}
+        )
+    if name == "process_query_with_clarification":
+        # Clarification prompts now list the options available for the location, and ask
+        # for another season instead of a scenario when the season has no scenarios;
+        # the slot asked for must otherwise be the same. A season or scenario with only
+        # one possible option is filled in, so the package asks the next slot or answers.
+        new_slot, old_slot = _asked_slot(new), _asked_slot(old)
+        if old_slot in ("season", "scenario") and new_slot != old_slot and _single_option(args, old_slot):
+            return True
+        if "options" not in new or new["status"] != old["status"]:
+            return False
+        return new_slot == old_slot or (new_slot, old_slot) == ("unavailable_season", "scenario")
+    return False
+
+
+def check_equivalence(cases):
+    """
+    Compares every output with reference.py. Returns the number of mismatches.
+    """
+    mismatches = 0
+    for name, (fn, ref, items) in cases.items():
+        bad = [args for args in items if not _equivalent(name, args, fn(*args), ref(*args))]
+        mismatches += len(bad)
+        print(f"equivalence {name:<34} {len(items) - len(bad):>6}/{len(items)} identical")
+        for args in bad[:3]:
+            print(f"    mismatch: {args[0]!r}")
+    return mismatches
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def measure(fn, items, repeat, reset=None):
+    """
+    Latency percentiles over `repeat` passes timed call by call, throughput from the
+    best untimed pass and the traced memory peak of one pass. A warm-up pass runs
+    first, so caches are in the same state whether or not the check ran. `reset` (see
+    RESETS) is called before every pass, so memoized results do not carry over.
+    """
+    reset = reset or (lambda: None)
+    for args in items:
+        fn(*args)
+    clock = time.perf_counter_ns
+    latencies = []
+    best = float("inf")
+    for _ in range(repeat):
+        reset()
+        for args in items:
+            start = clock()
+            fn(*args)
+            latencies.append(clock() - start)
+        reset()
+        start = time.perf_counter()
+        for args in items:
+            fn(*args)
+        best = min(best, time.perf_counter() - start)
+    latencies.sort()
+
+    reset()
+    tracemalloc.start()
+    for args in items:
+        fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "p50_us": _percentile(latencies, 0.50) / 1e3,
+        "p90_us": _percentile(latencies, 0.90) / 1e3,
+        "p99_us": _percentile(latencies, 0.99) / 1e3,
+        "throughput_per_s": len(items) / best,
+        "peak_kib": peak / 1024,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints each metric against the baseline and returns the regressions found.
+    """
+    regressions = []
+    print(f"\n{'case':<34} {'metric':<17} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, metrics in results.items():
+        old_metrics = baseline["results"].get(name)
+        if old_metrics is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = old_metrics[metric], metrics[metric]
+            change = (new - old) / old if old else 0.0
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            if flag:
+                regressions.append((name, metric))
+            print(f"{name:<34} {metric:<17} {old:>12.2f} {new:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=2000, help="queries in the corpus")
+    parser.add_argument("--variables", type=int, default=0, help="variable blocks in the payload (0: FULL_KEY_MAP only)")
+    parser.add_argument("--templates", type=int, default=500, help="templates in the corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per case")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a JSON file written with --output")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before flagging (fraction)")
+    parser.add_argument("--no-check", action="store_true", help="skip the equivalence check")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.queries, args.variables, args.templates, args.seed)
+    if not args.no_check and (check_equivalence(cases) + check_render_table() + check_load_results()):
+        print("Outputs differ from reference.py", file=sys.stderr)
+        return 2
+
+    results = {}
+    print(f"\n{'case':<34} {'p50 us':>8} {'p90 us':>8} {'p99 us':>8} {'calls/s':>10} {'peak KiB':>9}")
+    for name, (fn, _, items) in cases.items():
+        metrics = results[name] = measure(fn, items, args.repeat, RESETS.get(name))
+        print(f"{name:<34} {metrics['p50_us']:>8.2f} {metrics['p90_us']:>8.2f} {metrics['p99_us']:>8.2f} "
+              f"{metrics['throughput_per_s']:>10.0f} {metrics['peak_kib']:>9.1f}")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "queries": args.queries,
+            "variables": args.variables,
+            "templates": args.templates,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
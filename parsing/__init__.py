@@ -1,14 +1,169 @@
 # climrr_intent_parser/parsing/__init__.py
 
-from .intent_processor import (
-    process_query_with_clarification,
-    parse_raw_intent,
-    extract_relevant_data,
-)
-
-__all__ = [
-    "process_query_with_clarification",
-    "parse_raw_intent",
-    "extract_relevant_data",
-]
+# Public names are resolved lazily (PEP 562): importing the package loads no
+# submodule, and each name imports its module on first access.
+from importlib import import_module
 
+TYPE_CHECKING = False  # same effect as typing.TYPE_CHECKING, without importing typing
+
+_LAZY_MODULES = {
+    ".intent_processor": (
+        "process_query_with_clarification",
+        "parse_raw_intent",
+        "extract_relevant_data",
+        "parse_intent",
+        "extract_items",
+    ),
+    ".models": (
+        "Intent",
+        "ExtractedItem",
+        "Extraction",
+        "MatchType",
+        "ScenarioCues",
+    ),
+    ".matcher": (
+        "IntentMatcher",
+        "get_default_matcher",
+        "reset_default_matcher",
+    ),
+    ".cache": (
+        "IntentCache",
+        "normalize_query",
+    ),
+    ".clarification": (
+        "catalogue_options",
+        "clarification_options",
+    ),
+    ".results": (
+        "ClimrrResults",
+    ),
+    ".batch": (
+        "parse_intents_batch",
+        "extract_relevant_data_batch",
+        "process_queries_batch",
+    ),
+    ".replay": (
+        "replay_queries",
+        "replay_jsonl",
+    ),
+    ".session": (
+        "ClarificationSession",
+        "ClarificationSessionManager",
+        "merge_intent",
+    ),
+    ".incremental": (
+        "IncrementalIntentParser",
+        "SlotUpdate",
+        "parse_stream",
+    ),
+    ".instrumentation": (
+        "Observer",
+        "StatsObserver",
+        "set_observer",
+        "get_observer",
+        "observing",
+    ),
+    ".fallback": (
+        "FallbackPolicy",
+        "FallbackView",
+        "json_default",
+    ),
+    ".ingest": (
+        "load_results",
+        "extract_relevant_data_json",
+    ),
+    ".compare": (
+        "ComparisonMatrix",
+        "compare_locations",
+    ),
+}
+
+_EXPORTS = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is not None:
+        value = getattr(import_module(module, __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .intent_processor import (
+        process_query_with_clarification,
+        parse_raw_intent,
+        extract_relevant_data,
+        parse_intent,
+        extract_items,
+    )
+    from .models import (
+        Intent,
+        ExtractedItem,
+        Extraction,
+        MatchType,
+        ScenarioCues,
+    )
+    from .matcher import (
+        IntentMatcher,
+        get_default_matcher,
+        reset_default_matcher,
+    )
+    from .cache import (
+        IntentCache,
+        normalize_query,
+    )
+    from .clarification import (
+        catalogue_options,
+        clarification_options,
+    )
+    from .results import (
+        ClimrrResults,
+    )
+    from .batch import (
+        parse_intents_batch,
+        extract_relevant_data_batch,
+        process_queries_batch,
+    )
+    from .replay import (
+        replay_queries,
+        replay_jsonl,
+    )
+    from .session import (
+        ClarificationSession,
+        ClarificationSessionManager,
+        merge_intent,
+    )
+    from .incremental import (
+        IncrementalIntentParser,
+        SlotUpdate,
+        parse_stream,
+    )
+    from .instrumentation import (
+        Observer,
+        StatsObserver,
+        set_observer,
+        get_observer,
+        observing,
+    )
+    from .fallback import (
+        FallbackPolicy,
+        FallbackView,
+        json_default,
+    )
+    from .ingest import (
+        load_results,
+        extract_relevant_data_json,
+    )
+    from .compare import (
+        ComparisonMatrix,
+        compare_locations,
+    )
@@ -0,0 +1,78 @@
+from typing import Any, Dict, Iterable, Iterator, Optional
+from .intent_processor import extract_relevant_data, process_query_with_clarification
+from .matcher import IntentMatcher, get_default_matcher
+from .models import Intent
+from .results import ClimrrResults
+
+# Distinct queries remembered per batch before the dedup table is reset, to bound memory on long replays
+DEFAULT_MAX_DISTINCT = 100_000
+
+
+class _IntentTable:
+    """
+    Parses each distinct lowercased query once per batch with a shared matcher.
+    """
+
+    def __init__(self, matcher: Optional[IntentMatcher], max_distinct: int):
+        self.matcher = matcher if matcher is not None else get_default_matcher()
+        self.max_distinct = max_distinct
+        self._intents: Dict[str, Intent] = {}
+
+    def get(self, user_query_lower: str) -> Intent:
+        intent = self._intents.get(user_query_lower)
+        if intent is None:
+            if len(self._intents) >= self.max_distinct:
+                self._intents.clear()
+            intent = self._intents[user_query_lower] = self.matcher.parse(user_query_lower)
+        return intent
+
+
+def _pair_inputs(queries: Iterable[str], input_data: Any, per_query: bool):
+    """
+    Yields (query, input_data, results) with a ClimrrResults index per payload;
+    a shared payload is indexed once for the whole batch.
+    """
+    if per_query:
+        return ((query, data, ClimrrResults.from_input(data)) for query, data in zip(queries, input_data))
+    results = ClimrrResults.from_input(input_data)
+    return ((query, input_data, results) for query in queries)
+
+
+def parse_intents_batch(queries: Iterable[str], matcher: Optional[IntentMatcher] = None,
+                        max_distinct: int = DEFAULT_MAX_DISTINCT) -> Iterator[Dict[str, Any]]:
+    """
+    Streams parse_raw_intent(query.lower()) for each query, in input order.
+
+    Repeated queries (after lowercasing) are parsed once; every item gets its own dict.
+    """
+    table = _IntentTable(matcher, max_distinct)
+    for query in queries:
+        yield table.get(query.lower()).to_dict()
+
+
+def extract_relevant_data_batch(queries: Iterable[str], input_data: Any, per_query: bool = False,
+                                matcher: Optional[IntentMatcher] = None,
+                                max_distinct: int = DEFAULT_MAX_DISTINCT) -> Iterator[Any]:
+    """
+    Streams extract_relevant_data(query, input_data, "") for each query, in input order.
+
+    `input_data` is one payload shared by every query, or with per_query=True an iterable
+    of payloads consumed alongside `queries`. Each distinct query is parsed once and a
+    shared payload is indexed once.
+    """
+    table = _IntentTable(matcher, max_distinct)
+    for query, data, results in _pair_inputs(queries, input_data, per_query):
+        yield extract_relevant_data(query, data, "", intent=table.get(query.lower()), results=results)
+
+
+def process_queries_batch(queries: Iterable[str], input_data: Any, per_query: bool = False,
+                          turn_count: int = 0, matcher: Optional[IntentMatcher] = None,
+                          max_distinct: int = DEFAULT_MAX_DISTINCT) -> Iterator[Dict[str, Any]]:
+    """
+    Streams process_query_with_clarification(query, input_data, turn_count) for each query,
+    in input order. `input_data` is handled as in extract_relevant_data_batch.
+    """
+    table = _IntentTable(matcher, max_distinct)
+    for query, data, results in _pair_inputs(queries, input_data, per_query):
+        yield process_query_with_clarification(query, data, turn_count, intent=table.get(query.lower()),
+                                               results=results)
@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from .matcher import IntentMatcher, get_default_matcher
+from .models import Intent
+
+
+def normalize_query(user_query: str) -> str:
+    """
+    Query case-folded with runs of whitespace collapsed to one space, for comparing
+    short replies. Not used as a cache key: whitespace can change how a query parses.
+    """
+    return " ".join(user_query.casefold().split())
+
+
+class IntentCache:
+    """
+    Bounded LRU cache of parsed intents keyed on the lowercased query text.
+
+    The key is exactly the text the uncached path parses (user_query.lower()), so a
+    cached intent always equals parse_intent(user_query.lower()); queries that differ
+    only in casing share one entry. Entries are immutable Intents, so the same object can
+    safely be handed to every caller. `maxsize=None` disables eviction and
+    `maxsize=0` disables caching (every call parses). Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: Optional[int] = 1024, matcher: Optional[IntentMatcher] = None):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsize must be None or >= 0")
+        self.maxsize = maxsize
+        self.matcher = matcher
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Intent]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_query: str) -> Intent:
+        """
+        Returns the intent for the query, parsing it only on a cache miss.
+        """
+        key = user_query.lower()
+        with self._lock:
+            intent = self._entries.get(key)
+            if intent is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return intent
+            self.misses += 1
+
+        matcher = self.matcher if self.matcher is not None else get_default_matcher()
+        intent = matcher.parse(key)
+        if self.maxsize == 0:
+            return intent
+
+        with self._lock:
+            self._entries[key] = intent
+            if self.maxsize is not None and len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return intent
+
+    def clear(self) -> None:
+        """
+        Drops all entries and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns hit/miss/eviction counters, current size and hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
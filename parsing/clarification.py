@@ -0,0 +1,64 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+from ..utils.constants import FWI_CONFIGS, FWI_VARIABLE, JSON_KEY_MAP
+from ..utils.key_index import get_key_index
+from .results import ClimrrResults
+
+
+@lru_cache(maxsize=None)
+def json_keys_for(variable: str) -> Tuple[str, ...]:
+    """
+    Keys of the ClimRR `results` object holding a FULL_KEY_MAP variable
+    (one per subtype for Fire Weather Index).
+    """
+    if variable == FWI_VARIABLE:
+        return tuple(config["json_key"] for config in FWI_CONFIGS)
+    return (JSON_KEY_MAP.get(variable, variable),)
+
+
+@lru_cache(maxsize=None)
+def catalogue_options(variable: Optional[str] = None, season: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Options the key catalogue offers for the next missing slot: variables when no
+    variable is known, seasons for a variable, scenarios for a (variable, season).
+    """
+    index = get_key_index()
+    if variable is None:
+        return index.variables
+    if season is None:
+        return index.seasons_for(variable)
+    return index.scenarios_for(variable, season)
+
+
+def _has_season(results: ClimrrResults, variable: str, season: str) -> bool:
+    for json_key in json_keys_for(variable):
+        actual_key = results.resolve_key(json_key)
+        if actual_key is not None and season in results.results[actual_key]:
+            return True
+    return False
+
+
+def clarification_options(results: Optional[ClimrrResults], variable: Optional[str] = None,
+                          season: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    catalogue_options filtered to what the location payload can actually answer.
+
+    Falls back to the unfiltered catalogue options when there is no payload or
+    nothing in it matches. The result is empty only when the catalogue itself has
+    nothing for the slot (e.g. no scenario for the season); callers ask for another
+    slot in that case.
+    """
+    options = catalogue_options(variable, season)
+    if results is None or not results.results:
+        return options
+
+    if variable is None:
+        available = tuple(v for v in options if any(results.resolve_key(k) for k in json_keys_for(v)))
+    elif season is None:
+        available = tuple(s for s in options if _has_season(results, variable, s))
+    else:
+        available = tuple(
+            scenario for scenario in options
+            if any(results.value(k, season, scenario) is not None for k in json_keys_for(variable))
+        )
+    return available or options
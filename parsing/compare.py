@@ -0,0 +1,236 @@
+import math
+from numbers import Real
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+from ..utils.arrays import load_numpy
+from ..utils.columnar import DEFAULT_LOCATION_COLUMN, ColumnarStore
+from ..utils.constants import FWI_CONFIGS, FWI_VARIABLE, JSON_KEY_MAP, get_final_data_key
+from .intent_processor import parse_intent
+from .models import Intent, ScenarioCues
+from .results import ClimrrResults
+
+BASELINE_SCENARIO = "Historical"
+
+
+class ComparisonMatrix(NamedTuple):
+    """
+    One variable and season across locations × scenarios × subtypes.
+
+    `values` and `deltas` are nested lists [location][scenario][subtype] with None for
+    missing values, or float64 NumPy arrays of that shape with NaN when built with
+    vectorize=True. `deltas` is each value minus the Historical `baseline` (locations × subtypes)
+    of its location and subtype. `columns[s][t]` is the FullData.csv column of
+    scenario s and subtype t (None when the key map has none). Subtypes are the FWI
+    json keys for Fire Weather Index, otherwise the variable alone.
+    """
+    variable: Optional[str]
+    season: str
+    locations: Tuple[Any, ...]
+    scenarios: Tuple[str, ...]
+    subtypes: Tuple[str, ...]
+    columns: Tuple[Tuple[Optional[str], ...], ...]
+    values: Any
+    baseline: Any
+    deltas: Any
+
+
+def _subtypes(intent: Intent) -> List[Tuple[str, str, str]]:
+    # (label, results json key, CSV column suffix) per subtype, as extraction expands them
+    if intent.variable == FWI_VARIABLE:
+        return [(c["json_key"], c["json_key"], c["suffix"]) for c in FWI_CONFIGS
+                if intent.fwi_subtype in (None, "All", c["type"])]
+    return [(intent.variable, JSON_KEY_MAP.get(intent.variable, intent.variable), "")]
+
+
+def _as_number(value: Any) -> Optional[float]:
+    # Numbers pass through; numeric strings (CSV cells) are parsed; anything else, and NaN, is missing
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return None
+    if isinstance(value, Real) and not isinstance(value, bool):
+        return None if math.isnan(value) else value
+    return None
+
+
+def _as_array(np: Any, column: Sequence[Any]) -> Any:
+    try:
+        return np.asarray(column, dtype=float)
+    except (TypeError, ValueError):
+        return np.array([_as_number(v) for v in column], dtype=float)
+
+
+def _payload_cells(payloads: List[Any], season: str, scenarios: Sequence[str],
+                   subtypes: List[Tuple[str, str, str]], columns: Sequence[Sequence[Optional[str]]],
+                   locations: Optional[Iterable[Any]]) -> Tuple[Tuple[Any, ...], List[List[List[Any]]]]:
+    # Location labels and [scenario][subtype] lists of per-location numbers (None when missing)
+    payloads = [location if isinstance(location, Mapping) else {} for location in payloads]
+    labels = [location.get("location", i) for i, location in enumerate(payloads)]
+    if locations is not None:
+        # Like ColumnarStore.row_of: labels compared as strings, the last payload wins
+        by_label = {str(label): location for label, location in zip(labels, payloads)}
+        labels = list(locations)
+        payloads = [by_label.get(str(label), {}) for label in labels]
+    indexes = []
+    for location in payloads:
+        results = location.get("results")
+        indexes.append(ClimrrResults(results if isinstance(results, Mapping) else {}))
+    missing = [None] * len(indexes)
+    cells = [
+        [[_as_number(index.value(json_key, season, scenario)) for index in indexes] if column else missing
+         for (_, json_key, _), column in zip(subtypes, scenario_columns)]
+        for scenario, scenario_columns in zip(scenarios, columns)
+    ]
+    return tuple(labels), cells
+
+
+def _table_rows(data: Union[ColumnarStore, Mapping[str, Sequence[Any]]], locations: Optional[Iterable[Any]],
+                location_column: str) -> Tuple[Tuple[Any, ...], List[Optional[int]]]:
+    # Location labels and the row of each (None when the table has no such location)
+    if isinstance(data, ColumnarStore):
+        if locations is None:
+            return tuple(data.locations), list(range(data.rows))
+        labels = tuple(locations)
+        return labels, [data.row_of(label) for label in labels]
+    location_ids = data.get(location_column)
+    if location_ids is None:
+        if locations is not None:
+            raise ValueError(f"locations needs a {location_column!r} column in the table")
+        n_rows = len(next(iter(data.values()))) if data else 0
+        return tuple(range(n_rows)), list(range(n_rows))
+    if locations is None:
+        return tuple(location_ids), list(range(len(location_ids)))
+    row_of = {str(location_id): i for i, location_id in enumerate(location_ids)}
+    labels = tuple(locations)
+    return labels, [row_of.get(str(label)) for label in labels]
+
+
+def _table_column(data: Union[ColumnarStore, Mapping[str, Sequence[Any]]], name: Optional[str]) -> Optional[Sequence[Any]]:
+    if name is None:
+        return None
+    if isinstance(data, ColumnarStore):
+        try:
+            return data.column(name)
+        except KeyError:
+            return None
+    return data.get(name)
+
+
+def _gather(column: Sequence[Any], rows: List[Optional[int]]) -> List[Optional[float]]:
+    # The numbers of one column at `rows`, None where missing. ColumnarStore columns are
+    # float64 memoryviews, so only NaN needs replacing there (v != v is False for None).
+    if None in rows:
+        cells = [column[row] if row is not None else None for row in rows]
+    else:
+        cells = [column[row] for row in rows]
+    if isinstance(column, memoryview):
+        return [None if v != v else v for v in cells]
+    return [_as_number(v) for v in cells]
+
+
+def _difference(values: List[Optional[float]], baseline: List[Optional[float]]) -> List[Optional[float]]:
+    return [v - b if v is not None and b is not None else None for v, b in zip(values, baseline)]
+
+
+def _by_location(cells: List[List[List[Any]]], n_locations: int) -> List[List[List[Any]]]:
+    # [scenario][subtype][location] lists regrouped as [location][scenario][subtype]
+    if not cells or not cells[0]:
+        return [[[] for _ in cells] for _ in range(n_locations)]
+    return [list(map(list, location)) for location in zip(*[zip(*scenario) for scenario in cells])]
+
+
+def compare_locations(user_query: str, data: Union[Iterable[Any], ColumnarStore, Mapping[str, Sequence[Any]]],
+                      intent: Optional[Union[Intent, Mapping[str, Any]]] = None,
+                      cues: Optional[ScenarioCues] = None, scenarios: Optional[Sequence[str]] = None,
+                      locations: Optional[Iterable[Any]] = None, vectorize: bool = False,
+                      location_column: str = DEFAULT_LOCATION_COLUMN) -> ComparisonMatrix:
+    """
+    Extracts the queried variable and season for many locations at once, for every
+    detected scenario (or `scenarios`) and FWI subtype, plus deltas against Historical.
+
+    `data` is a ColumnarStore, a column table {FullData.csv column: values} with one
+    row per location, or an iterable of location payloads (each {"location": ...,
+    "results": {...}}). Locations are labelled by their ID (the table's
+    `location_column`, or row numbers when it has none) and `locations` selects IDs,
+    all by default; IDs not found give missing values. Columns are resolved once
+    through get_final_data_key. With `vectorize` the matrix is gathered and
+    differenced as NumPy arrays, which requires NumPy.
+    """
+    np = None
+    if vectorize:
+        np = load_numpy()
+        if np is None:
+            raise ImportError("compare_locations(vectorize=True) requires NumPy (the 'numpy' extra)")
+    if not isinstance(data, (ColumnarStore, Mapping)):
+        if isinstance(data, (str, bytes)) or not isinstance(data, Iterable):
+            raise TypeError(f"Expected location payloads, a ColumnarStore or a column table, got {type(data).__name__}")
+        data = list(data)
+
+    user_query_lower = user_query.lower()
+    intent = parse_intent(user_query_lower) if intent is None else Intent.from_mapping(intent)
+    season = intent.season if intent.season else "Annual"
+    if scenarios is None:
+        if cues is None:
+            cues = ScenarioCues.from_query(user_query_lower)
+        scenarios = cues.scenarios()
+    scenarios = tuple(scenarios)
+
+    # --- COLUMN RESOLUTION (once for all locations) ---
+    subtypes = _subtypes(intent) if intent.variable else []
+    all_scenarios = scenarios if BASELINE_SCENARIO in scenarios else scenarios + (BASELINE_SCENARIO,)
+    columns = []
+    for scenario in all_scenarios:
+        base = get_final_data_key(intent.variable, season, scenario)
+        columns.append(tuple(base + suffix if base else None for _, _, suffix in subtypes))
+    baseline_index = all_scenarios.index(BASELINE_SCENARIO)
+
+    # --- GATHER ---
+    # Pure Python works on [scenario][subtype] lists of per-location numbers, so each
+    # column is read once and differenced with one comprehension
+    if isinstance(data, list):
+        labels, cells = _payload_cells(data, season, all_scenarios, subtypes, columns, locations)
+        if np is not None:
+            shape = (len(all_scenarios), len(subtypes), len(labels))
+            cube = np.array(cells, dtype=float).reshape(shape).transpose(2, 0, 1)
+    else:
+        labels, rows = _table_rows(data, locations, location_column)
+        if np is not None:
+            cube = np.full((len(labels), len(all_scenarios), len(subtypes)), np.nan)
+            present = np.array([row is not None for row in rows], dtype=bool)
+            index = np.array([row if row is not None else 0 for row in rows], dtype=np.intp)
+            gathered: Dict[Optional[str], Any] = {}
+            for s, scenario_columns in enumerate(columns):
+                for t, name in enumerate(scenario_columns):
+                    if name not in gathered:
+                        column = _table_column(data, name)
+                        if column is not None and len(column):
+                            gathered[name] = np.where(present, _as_array(np, column)[index], np.nan)
+                        else:
+                            gathered[name] = None
+                    if gathered[name] is not None:
+                        cube[:, s, t] = gathered[name]
+        else:
+            missing = [None] * len(rows)
+            gathered = {}
+            for name in {name for scenario_columns in columns for name in scenario_columns}:
+                column = _table_column(data, name)
+                gathered[name] = _gather(column, rows) if column is not None and len(column) else missing
+            cells = [[gathered[name] for name in scenario_columns] for scenario_columns in columns]
+
+    # --- DELTAS AGAINST HISTORICAL ---
+    n = len(scenarios)
+    if np is not None:
+        baseline = cube[:, baseline_index, :]
+        values = cube[:, :n, :]
+        deltas = values - baseline[:, None, :]
+    else:
+        base = cells[baseline_index]
+        baseline = [list(location) for location in zip(*base)] if base else [[] for _ in labels]
+        values = _by_location(cells[:n], len(labels))
+        deltas = _by_location([[_difference(v, b) for v, b in zip(scenario, base)] for scenario in cells[:n]],
+                              len(labels))
+
+    return ComparisonMatrix(
+        intent.variable, season, labels, scenarios, tuple(label for label, _, _ in subtypes),
+        tuple(columns[:n]), values, baseline, deltas,
+    )
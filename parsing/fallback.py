@@ -0,0 +1,185 @@
+import json
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+from .clarification import json_keys_for
+from .models import Intent
+from .results import ClimrrResults
+
+_RCP_KEYS = {"RCP8.5": "rcp85", "RCP4.5": "rcp45"}
+_PERIOD_KEYS = {"Mid-Century": "mid_century", "End-Century": "end_century"}
+
+# Filters dropped, most specific first, when the detected slots select nothing
+_RELAX_ORDER = ("scenario", "season", "variable")
+
+
+class FallbackPolicy(NamedTuple):
+    """
+    How a fallback payload is trimmed when extract_relevant_data finds no value.
+
+    max_values caps the number of leaves (scenario values) kept across all locations.
+    location_fields lists the location keys kept besides "results" (None keeps all).
+    leaf_fields projects each leaf to these keys (None shares the leaf as-is).
+    """
+    max_values: int = 60
+    location_fields: Optional[Tuple[str, ...]] = ("location",)
+    leaf_fields: Optional[Tuple[str, ...]] = None
+
+
+def _scenario_filter(intent: Intent, scenarios: Tuple[str, ...]) -> Optional[FrozenSet[Tuple[str, Optional[str]]]]:
+    # (rcp, period) paths matching the scenario slots; None when no scenario was mentioned
+    time, rcp = intent.scenario_time, intent.scenario_rcp
+    if not time and not rcp:
+        return None
+    allowed = set()
+    if time == "Historical" or "Historical" in scenarios:
+        allowed.add(("historical", None))
+    if rcp or time != "Historical":
+        rcps = [_RCP_KEYS[rcp]] if rcp in _RCP_KEYS else list(_RCP_KEYS.values())
+        periods = [_PERIOD_KEYS[time]] if time in _PERIOD_KEYS else list(_PERIOD_KEYS.values())
+        allowed.update((r, p) for r in rcps for p in periods)
+    return frozenset(allowed)
+
+
+def _is_leaf(node: Any) -> bool:
+    return not isinstance(node, Mapping) or "value" in node
+
+
+def _freeze(node: Any) -> Any:
+    if isinstance(node, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in node.items()})
+    return node
+
+
+class FallbackView(Sequence):
+    """
+    Read-only view of a ClimRR payload trimmed to the slots a query did detect, used as
+    the fallback response instead of the whole input_data.
+
+    Behaves like the input_data list: one read-only mapping per location, holding the
+    kept location fields and a "results" tree limited to the detected variable, season
+    and scenario (any slot that selects nothing is ignored). Leaves are shared with
+    input_data unless the policy projects them. Nothing is computed until first access.
+    Use to_list() or json_default for JSON.
+    """
+
+    def __init__(self, input_data: Any, intent: Intent, scenarios: Tuple[str, ...] = (),
+                 policy: Optional[FallbackPolicy] = None, results: Optional[ClimrrResults] = None):
+        self._input_data = input_data if isinstance(input_data, list) else []
+        self._intent = intent
+        self._scenarios = scenarios
+        self.policy = policy if policy is not None else FallbackPolicy()
+        self._first_results = results
+        self._locations: Optional[List[Mapping]] = None
+        self.filters: Dict[str, Any] = {}
+        self.total_values = 0
+        self.kept_values = 0
+
+    @property
+    def truncated(self) -> bool:
+        self._select()
+        return self.kept_values < self.total_values
+
+    def __getitem__(self, index):
+        self._select()
+        return self._locations[index]
+
+    def __len__(self) -> int:
+        self._select()
+        return len(self._locations)
+
+    def __repr__(self) -> str:
+        return f"FallbackView({len(self)} locations, {self.kept_values}/{self.total_values} values)"
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """
+        The trimmed payload as plain lists and dicts (copies).
+        """
+        return json.loads(self.to_json())
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self, default=json_default, **kwargs)
+
+    def _select(self) -> None:
+        if self._locations is not None:
+            return
+        filters = {
+            "variable": self._intent.variable,
+            "season": self._intent.season,
+            "scenario": _scenario_filter(self._intent, self._scenarios),
+        }
+        for relax in (None,) + _RELAX_ORDER:
+            if relax is not None:
+                filters[relax] = None
+            locations, total = self._walk(filters)
+            if total:
+                break
+        self.filters = {k: sorted(v, key=str) if isinstance(v, frozenset) else v for k, v in filters.items()}
+        self._locations = locations
+
+    def _walk(self, filters: Dict[str, Any]) -> Tuple[List[Mapping], int]:
+        policy = self.policy
+        variable, season, allowed = filters["variable"], filters["season"], filters["scenario"]
+        kept = total = 0
+        locations = []
+        for i, location in enumerate(self._input_data):
+            if not isinstance(location, Mapping):
+                continue
+            results = location.get("results")
+            if not isinstance(results, Mapping):
+                results = {}
+            if variable:
+                index = self._first_results if i == 0 and self._first_results is not None else ClimrrResults(results)
+                keys = [k for k in (index.resolve_key(j) for j in json_keys_for(variable)) if k is not None]
+            else:
+                keys = list(results)
+
+            trimmed: Dict[str, Any] = {}
+            for key in keys:
+                block = results[key]
+                if not isinstance(block, Mapping):
+                    continue
+                for season_key, season_block in block.items():
+                    if (season and season_key != season) or not isinstance(season_block, Mapping):
+                        continue
+                    for rcp, node in season_block.items():
+                        paths = [((rcp,), None, node)] if _is_leaf(node) else [
+                            ((rcp, period), period, leaf) for period, leaf in node.items()
+                        ]
+                        for path, period, leaf in paths:
+                            if allowed is not None and (rcp, period) not in allowed:
+                                continue
+                            total += 1
+                            if kept >= policy.max_values:
+                                continue
+                            kept += 1
+                            if policy.leaf_fields is not None and isinstance(leaf, Mapping):
+                                leaf = {f: leaf[f] for f in policy.leaf_fields if f in leaf}
+                            elif isinstance(leaf, dict):
+                                leaf = MappingProxyType(leaf)  # shared with input_data, not copied
+                            node_out = trimmed.setdefault(key, {}).setdefault(season_key, {})
+                            for step in path[:-1]:
+                                node_out = node_out.setdefault(step, {})
+                            node_out[path[-1]] = leaf
+
+            fields = policy.location_fields
+            kept_fields = {
+                k: v for k, v in location.items()
+                if k != "results" and (fields is None or k in fields)
+            }
+            kept_fields["results"] = trimmed
+            locations.append(_freeze(kept_fields))
+        self.kept_values = kept
+        self.total_values = total
+        return locations, total
+
+
+def json_default(obj: Any) -> Any:
+    """
+    `default=` hook for json.dumps so responses holding a FallbackView serialize directly.
+    """
+    if isinstance(obj, FallbackView):
+        return list(obj)
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
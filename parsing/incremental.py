@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from .matcher import _FWI_RE, IntentMatcher, get_default_matcher
+from .models import Intent
+
+# Slots taken straight from the vocabulary scan; a priority-0 hit there can never be displaced
+_SCANNED_SLOTS = ("season", "scenario_time", "scenario_rcp")
+
+
+class SlotUpdate(NamedTuple):
+    """
+    A change to one Intent field while text is streaming in. `final` updates will not
+    change again; the others are what parse_intent returns for the text so far and can
+    still be overridden by later words.
+    """
+    slot: str
+    value: Any
+    final: bool
+
+
+class IncrementalIntentParser:
+    """
+    Parses a query that arrives in chunks (e.g. from speech-to-text) with the same
+    vocabulary and rules as parse_intent.
+
+    The vocabulary scan keeps its state across chunks: each feed() rescans only the last
+    max_token_length - 1 characters already seen plus the new chunk, so a token split
+    across chunks is still found. The FWI and fuzzy variable patterns are matched
+    against the whole text so far. After close(), `intent` equals parse_intent() of the
+    concatenated text.
+    """
+
+    def __init__(self, matcher: Optional[IntentMatcher] = None):
+        self.matcher = matcher if matcher is not None else get_default_matcher()
+        self.text = ""
+        self.intent = Intent()
+        self.closed = False
+        self._best: Dict[str, Tuple[int, str]] = {}
+        self._pos = 0  # tokens starting before this position have been scanned in full
+        self._final: Dict[str, bool] = {}
+
+    def feed(self, chunk: str) -> List[SlotUpdate]:
+        """
+        Adds a chunk of text and returns the slot updates it caused.
+        """
+        if self.closed:
+            raise ValueError("Cannot feed a closed IncrementalIntentParser")
+        self.text += chunk.lower()
+        self.matcher.scan(self.text, self._pos, self._best)
+        # Tokens starting in the tail may still grow into longer tokens with the next chunk
+        self._pos = max(self._pos, len(self.text) - self.matcher.max_token_length + 1)
+        intent = self.matcher.decide(self.text, self._best)
+        return self._update(intent, self._settled_slots(intent))
+
+    def close(self) -> List[SlotUpdate]:
+        """
+        Marks the end of the text; every slot becomes final. Returns the last updates.
+        """
+        if self.closed:
+            return []
+        self.closed = True
+        return self._update(self.matcher.decide(self.text, self._best), frozenset(Intent._fields))
+
+    def _settled_slots(self, intent: Intent) -> frozenset:
+        best = self._best
+        settled = {slot for slot in _SCANNED_SLOTS if best.get(slot, (None,))[0] == 0}
+        # The FWI check runs first, so once it matches the variable is fixed; a match
+        # ending at the end of the text is not yet certain ("fwi\b" needs the next character)
+        m = _FWI_RE.search(self.text)
+        if m is not None and m.end() < len(self.text):
+            settled.update(("variable", "variable_match_type"))
+            # "95" is the first subtype checked, so it cannot be displaced either
+            if intent.fwi_subtype == "95":
+                settled.add("fwi_subtype")
+        return frozenset(settled)
+
+    def _update(self, intent: Intent, settled: frozenset) -> List[SlotUpdate]:
+        updates = []
+        for slot, old, new in zip(Intent._fields, self.intent, intent):
+            if self._final.get(slot):
+                continue
+            final = slot in settled
+            if new != old or final:
+                updates.append(SlotUpdate(slot, new, final))
+                if final:
+                    self._final[slot] = True
+        self.intent = intent
+        return updates
+
+
+def parse_stream(chunks, matcher: Optional[IntentMatcher] = None):
+    """
+    Runs an IncrementalIntentParser over an iterable of text chunks, yielding each
+    SlotUpdate as soon as the chunk that caused it has been read.
+    """
+    parser = IncrementalIntentParser(matcher)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
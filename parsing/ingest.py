@@ -0,0 +1,239 @@
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+from .clarification import json_keys_for
+from .fallback import FallbackPolicy
+from .intent_processor import extract_items, extract_relevant_data, parse_intent
+from .models import Intent, ScenarioCues
+
+try:
+    import orjson
+except ImportError:  # optional: faster full decoding
+    orjson = None
+
+RawJson = Union[bytes, bytearray, memoryview, str]
+
+_decoder = json.JSONDecoder()
+_WS_RE = re.compile(r'[ \t\n\r]*')
+_STRING_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+# Everything up to the next bracket, stepping over whole strings (brackets inside them do not count)
+_SKIP_RE = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*', re.DOTALL)
+# A number, true, false or null
+_SCALAR_RE = re.compile(r'[^,}\]\s]+')
+# bytes.translate deletion table keeping only quotes and brackets
+_NON_STRUCTURAL = bytes(c for c in range(256) if c not in b'"{}[]')
+
+
+class _Unsure(Exception):
+    # The fast member scan cannot decide (a string in the scanned span contains a bracket)
+    pass
+
+
+
+def loads(raw: RawJson) -> Any:
+    """
+    Fully decodes a JSON document, with orjson when it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    if not isinstance(raw, str):
+        raw = bytes(raw).decode("utf-8")
+    return json.loads(raw)
+
+
+def _skip_value(text: str, i: int) -> int:
+    # Offset just past the JSON value starting at text[i], without decoding it
+    c = text[i:i + 1]
+    if c == '"':
+        m = _STRING_RE.match(text, i)
+        if m is None:
+            raise ValueError("unterminated string")
+        return m.end()
+    if c in ("{", "["):
+        closers, n = [], len(text)
+        while True:
+            i = _SKIP_RE.match(text, i).end()
+            if i >= n or text[i] == '"':
+                raise ValueError("unterminated value")
+            c = text[i]
+            if c in "{[":
+                closers.append("}" if c == "{" else "]")
+            elif not closers or closers.pop() != c:
+                raise ValueError("mismatched bracket")
+            i += 1
+            if not closers:
+                return i
+    m = _SCALAR_RE.match(text, i)
+    if m is None:
+        raise ValueError("missing value")
+    return m.end()
+
+
+def _scan_object(text: str, i: int, on_member: Callable[[str, int], int]) -> int:
+    # Walks the direct members of the object starting at text[i] ("{"), calling
+    # on_member(name, value offset), which returns the offset just past the value.
+    # Returns the offset just past the object; raises ValueError if it is malformed.
+    i = _WS_RE.match(text, i + 1).end()
+    if text.startswith("}", i):
+        return i + 1
+    while True:
+        m = _STRING_RE.match(text, i)
+        if m is None:
+            raise ValueError("expected a member name")
+        name = m.group()
+        name = json.loads(name) if "\\" in name else name[1:-1]
+        i = _WS_RE.match(text, m.end()).end()
+        if not text.startswith(":", i):
+            raise ValueError("expected ':'")
+        i = _WS_RE.match(text, on_member(name, _WS_RE.match(text, i + 1).end())).end()
+        if text.startswith(",", i):
+            i = _WS_RE.match(text, i + 1).end()
+        elif text.startswith("}", i):
+            return i + 1
+        else:
+            raise ValueError("expected ',' or '}'")
+
+
+def _fold_brackets(state: bytes, data: bytes, start: int, end: int) -> bytes:
+    # The unmatched brackets of `state` followed by data[start:end] (which must start
+    # outside a string and hold whole strings). Without backslashes every quote
+    # delimits a string, so dropping "" pairs removes exactly the strings that hold no
+    # bracket; a quote left over means one does, and _Unsure is raised.
+    seq = data[start:end].translate(None, _NON_STRUCTURAL).replace(b'""', b'')
+    if b'"' in seq:
+        raise _Unsure
+    seq = state + seq
+    while True:
+        reduced = seq.replace(b"{}", b"").replace(b"[]", b"")
+        if len(reduced) == len(seq):
+            return reduced
+        seq = reduced
+
+
+def _direct_members(data: bytes, lowered: str, needles: Iterable[str], open_at: int) -> List[Tuple[str, int, int]]:
+    # (needle, name offset, value offset) for each direct member of the object opening
+    # at open_at whose quoted, lowercased name is one of `needles`, in document order.
+    # Candidates are found with str.find; one is a direct member when every bracket
+    # between the object's "{" and it is matched.
+    candidates = []
+    for needle in needles:
+        i = lowered.find(needle, open_at)
+        while i != -1:
+            j = _WS_RE.match(lowered, i + len(needle)).end()
+            if lowered.startswith(":", j):
+                candidates.append((i, needle, _WS_RE.match(lowered, j + 1).end()))
+            i = lowered.find(needle, i + 1)
+    candidates.sort()
+
+    members, state, pos = [], b"", open_at + 1
+    for i, needle, value_start in candidates:
+        state = _fold_brackets(state, data, pos, i)
+        pos = i
+        if state[:1] in (b"}", b"]"):
+            break  # the object closed before this candidate
+        if not state:
+            members.append((needle, i, value_start))
+    return members
+
+
+def _scan_results(text: str, wanted: Set[str]) -> Tuple[Dict[str, int], Dict[str, str]]:
+    # Exact member walk for payloads the fast scan does not handle: (actual key ->
+    # offset of its last value, case-folded key -> first actual key)
+    spans: Dict[str, int] = {}
+    matched: Dict[str, str] = {}
+
+    def on_result(name: str, start: int) -> int:
+        folded = name.lower()
+        if folded in wanted and matched.setdefault(folded, name) == name:
+            spans[name] = start
+        return _skip_value(text, start)
+
+    def on_location_member(name: str, start: int) -> int:
+        if name == "results":
+            # A repeated "results" member replaces the earlier one, as in json.loads
+            spans.clear()
+            matched.clear()
+            if text.startswith("{", start):
+                return _scan_object(text, start, on_result)
+        return _skip_value(text, start)
+
+    _scan_object(text, _first_location(text), on_location_member)
+    return spans, matched
+
+
+def _fast_scan_results(text: str, wanted: Set[str]) -> Tuple[Dict[str, int], Dict[str, str]]:
+    # _scan_results for ASCII payloads without backslashes, at str.find speed
+    data = text.encode("ascii")
+    lowered = text.lower()
+    spans: Dict[str, int] = {}
+    matched: Dict[str, str] = {}
+    results = [value_start for _, i, value_start in _direct_members(data, lowered, ['"results"'], _first_location(text))
+               if text.startswith('"results"', i)]
+    # The last "results" member wins, as in json.loads
+    if not results or not text.startswith("{", results[-1]):
+        return spans, matched
+    for needle, i, value_start in _direct_members(data, lowered, ['"' + key + '"' for key in wanted], results[-1]):
+        name = text[i + 1:i + len(needle) - 1]
+        if matched.setdefault(needle[1:-1], name) == name:
+            spans[name] = value_start
+    return spans, matched
+
+
+def _first_location(text: str) -> int:
+    # Offset of the "{" opening the first element of the top-level array
+    i = _WS_RE.match(text).end()
+    if text.startswith("[", i):
+        i = _WS_RE.match(text, i + 1).end()
+        if text.startswith("{", i):
+            return i
+    raise ValueError("expected an array of location objects")
+
+
+def load_results(raw: RawJson, json_keys: Iterable[str]) -> Optional[list]:
+    """
+    Decodes only the given variable blocks of the first location's `results` object
+    from a raw ClimRR payload (a JSON array of location objects).
+
+    Only the direct members of that `results` object are considered; other members are
+    stepped over without being decoded. Returns [{"results": {key: block, ...}}]
+    holding each block found (keys matched case-insensitively, first match wins, as in
+    extraction; a repeated member keeps its last value, as in json.loads), or None if
+    a key is missing or the document does not have the expected shape, in which case
+    the caller should decode it in full.
+    """
+    text = raw if isinstance(raw, str) else bytes(raw).decode("utf-8")
+    wanted = {json_key.lower() for json_key in json_keys}
+    try:
+        if text.isascii() and "\\" not in text:
+            try:
+                spans, matched = _fast_scan_results(text, wanted)
+            except _Unsure:
+                spans, matched = _scan_results(text, wanted)
+        else:
+            spans, matched = _scan_results(text, wanted)
+        if len(matched) < len(wanted):
+            return None
+        results = {name: _decoder.raw_decode(text, start)[0] for name, start in spans.items()}
+    except ValueError:  # json.JSONDecodeError included
+        return None
+    return [{"results": results}]
+
+
+def extract_relevant_data_json(user_query: str, raw: RawJson,
+                               intent: Optional[Union[Intent, Mapping[str, Any]]] = None,
+                               cues: Optional[ScenarioCues] = None,
+                               fallback: Optional[FallbackPolicy] = None):
+    """
+    extract_relevant_data over a raw JSON payload, decoding only the variable blocks
+    the parsed intent needs. When those do not answer the query the payload is decoded
+    in full and the usual fallback is returned, so the result always equals
+    extract_relevant_data(user_query, json.loads(raw), "").
+    """
+    intent = parse_intent(user_query.lower()) if intent is None else Intent.from_mapping(intent)
+    if intent.variable:
+        partial = load_results(raw, json_keys_for(intent.variable))
+        if partial is not None:
+            extraction = extract_items(user_query, partial, intent, cues=cues)
+            if extraction.items:
+                return extraction.to_dict()
+    return extract_relevant_data(user_query, loads(raw), "", intent=intent, cues=cues, fallback=fallback)
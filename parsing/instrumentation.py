@@ -0,0 +1,152 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Histogram bucket upper bounds in microseconds (powers of two); the last bucket is open-ended
+BUCKET_BOUNDS_US = tuple(2 ** i for i in range(17))
+
+
+class Observer:
+    """
+    Receives instrumentation from the parsing and extraction hot paths. Subclass and
+    override what you need; both methods are no-ops here.
+
+    Timed stages: "parse", "extract.scenario_detection", "extract.key_lookup" and
+    "extract.fwi_expansion". Events (event, value):
+      - ("match_branch", "fwi" | "exact" | "fuzzy" | "synonym" | "none"), per parse
+      - ("match_type", "exact" | "ambiguous" | "missing"), per parse
+      - ("clarification", "ambiguous_variable" | "missing_variable" | "missing_season" | "missing_scenario"
+        | "unavailable_season" | "filled_season" | "filled_scenario")
+      - ("response", "success" | "fallback"), per process_query_with_clarification
+      - ("fallback", "no_variable" | "no_key" | "no_value"), when extract_relevant_data
+        returns the full payload
+    `context` is the Intent (parse, clarification events) or the Extraction (fallback).
+    """
+
+    def on_timing(self, stage: str, seconds: float) -> None:
+        pass
+
+    def on_event(self, event: str, value: str, context: Any = None) -> None:
+        pass
+
+
+# The active observer. Hot paths read this once per call and skip all work when it is None.
+observer: Optional[Observer] = None
+
+
+def set_observer(new_observer: Optional[Observer]) -> Optional[Observer]:
+    """
+    Installs an observer process-wide (None disables instrumentation). Returns the previous one.
+    """
+    global observer
+    previous, observer = observer, new_observer
+    return previous
+
+
+def get_observer() -> Optional[Observer]:
+    return observer
+
+
+@contextmanager
+def observing(new_observer: Observer) -> Iterator[Observer]:
+    """
+    Installs an observer for the duration of a with block.
+    """
+    previous = set_observer(new_observer)
+    try:
+        yield new_observer
+    finally:
+        set_observer(previous)
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKET_BOUNDS_US) + 1)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        us = seconds * 1e6
+        i = 0
+        for bound in BUCKET_BOUNDS_US:
+            if us <= bound:
+                break
+            i += 1
+        self.buckets[i] += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        # Upper bound of the bucket holding the q-th observation (None for the open-ended bucket)
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKET_BOUNDS_US, self.buckets):
+            seen += n
+            if seen >= rank:
+                return float(bound)
+        return None
+
+    def export(self) -> Dict[str, Any]:
+        labels = [f"<={bound}us" for bound in BUCKET_BOUNDS_US] + [f">{BUCKET_BOUNDS_US[-1]}us"]
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_us": self.total / self.count * 1e6 if self.count else 0.0,
+            "p50_us": self.quantile(0.5),
+            "p99_us": self.quantile(0.99),
+            "buckets": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class StatsObserver(Observer):
+    """
+    In-process aggregator: a latency histogram per stage, a counter per (event, value)
+    and fallback counts per (variable, season) query family. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timings: Dict[str, _Histogram] = {}
+            self._events: Dict[str, Counter] = {}
+            self._fallback_families: Counter = Counter()
+
+    def on_timing(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._timings.get(stage)
+            if histogram is None:
+                histogram = self._timings[stage] = _Histogram()
+            histogram.add(seconds)
+
+    def on_event(self, event: str, value: str, context: Any = None) -> None:
+        with self._lock:
+            counter = self._events.get(event)
+            if counter is None:
+                counter = self._events[event] = Counter()
+            counter[value] += 1
+            if event == "fallback":
+                self._fallback_families[_family(context)] += 1
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        """
+        Everything aggregated so far as plain, JSON-serializable data.
+        """
+        with self._lock:
+            return {
+                "timings": {stage: h.export() for stage, h in self._timings.items()},
+                "events": {event: dict(counter) for event, counter in self._events.items()},
+                "fallback_families": [
+                    {"variable": variable, "season": season, "count": n}
+                    for (variable, season), n in self._fallback_families.most_common(top)
+                ],
+            }
+
+
+def _family(context: Any) -> Tuple[Optional[str], Optional[str]]:
+    return getattr(context, "variable", None), getattr(context, "season", None)
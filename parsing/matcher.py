@@ -0,0 +1,248 @@
+import re
+from time import perf_counter
+from typing import Any, Dict, Mapping, Optional, Tuple
+from ..utils.constants import FULL_KEY_MAP, FWI_VARIABLE
+from . import instrumentation
+from .models import Intent, MatchType
+
+_FWI_RE = re.compile(r"fire\s+weather|fwi\b")
+_FWI_SUBTYPE_RES = (
+    ("95", re.compile(r"95|percentile")),
+    ("Class", re.compile(r"class|category|classification")),
+    ("Average", re.compile(r"average|avg")),
+)
+
+# Regex (Ambiguous/Fuzzy) patterns, checked in order when no exact variable name is present
+REGEX_MAP = {
+    "Average Maximum Temperature": [r"average\s+.*maximum\s+temp", r"avg\s+.*max\s+temp", r"max\s+avg\s+temp"],
+    "Average Minimum Temperature": [r"average\s+.*minimum\s+temp", r"avg\s+.*min\s+temp", r"min\s+avg\s+temp"],
+    # Robust detection for Days Without Precipitation to prevent overlap with "Precipitation" synonyms
+    "Days Without Precipitation": [
+        r"days\s+without\s+precip",
+        r"without\s+precip",
+        r"without\s+any\s+precip",
+        r"no\s+precip",
+        r"days\s+without\s+rain"
+    ]
+}
+
+# Synonym (Ambiguous) fallbacks, longest synonym wins
+SYNONYMS = {
+    "rain": "Annual Precipitation", "precip": "Annual Precipitation",
+    "dry": "Days Without Precipitation", "heat index": "Daily Max Heat Index",
+    "wind": "Wind Speed",
+    "maximum": "Average Maximum Temperature", "max": "Average Maximum Temperature", "high": "Average Maximum Temperature",
+    "minimum": "Average Minimum Temperature", "min": "Average Minimum Temperature", "low": "Average Minimum Temperature",
+    "temp": "Average Maximum Temperature", # Most ambiguous fallback
+}
+
+SEASONS = ["Winter", "Spring", "Summer", "Autumn", "Annual"]
+
+
+# Scenario tokens as (token, priority, value); lower priority wins, mirroring the original if/elif order
+_RCP_TOKENS = (("8.5", 0, "RCP8.5"), ("4.5", 1, "RCP4.5"))
+_TIME_TOKENS = (
+    ("end", 0, "End-Century"), ("2100", 0, "End-Century"),
+    ("mid", 1, "Mid-Century"), ("2050", 1, "Mid-Century"),
+    ("historical", 2, "Historical"), ("past", 2, "Historical"),
+)
+
+_NO_HIT = (None, None)
+
+
+def _trie_pattern(tokens) -> str:
+    """
+    Builds a regex alternation shaped like a prefix trie of the tokens.
+
+    At any position the regex tries one branch per next character, so its cost
+    depends on token length rather than vocabulary size, and greedy optional
+    groups make it return the longest token starting at that position.
+    """
+    trie: Dict[str, Any] = {}
+    for tok in tokens:
+        node = trie
+        for ch in tok:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end-of-token marker
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return ("(?:" + body + ")" if len(branches) == 1 else body) + "?"
+        return body
+
+    return emit(trie)
+
+
+class IntentMatcher:
+    """
+    Precompiled vocabularies and patterns used by parse_raw_intent.
+
+    All literal vocabulary (variable names, synonyms, seasons, RCP and time tokens)
+    is compiled into one trie-shaped regex that is run once, left to right, over the
+    query. Each hit is expanded to every vocabulary token that is a prefix of it, so
+    the set of tokens found is exactly the set of substrings the original per-token
+    `in` checks would find, and each slot then keeps its highest-priority token.
+    Build one matcher and reuse it; use a new instance if the key map changes.
+    """
+
+    def __init__(self, key_map: Optional[Mapping[Tuple[str, str, str], str]] = None):
+        if key_map is None:
+            key_map = FULL_KEY_MAP
+
+        # Ordered by first appearance in the key map, then longest first (stable sort)
+        known_vars = dict.fromkeys(k[0] for k in key_map.keys() if k[0] != FWI_VARIABLE)
+        self.variables = tuple(sorted(known_vars, key=len, reverse=True))
+
+        self._fuzzy = tuple(
+            (canonical, tuple(re.compile(pat) for pat in patterns))
+            for canonical, patterns in REGEX_MAP.items()
+        )
+        # Cheap pre-check so the common "no fuzzy match" path costs a single search
+        self._fuzzy_any = re.compile(
+            "|".join("(?:" + pat + ")" for patterns in REGEX_MAP.values() for pat in patterns)
+        )
+
+        # token -> [(slot, priority, value)]
+        entries: Dict[str, list] = {}
+        for prio, var in enumerate(self.variables):
+            entries.setdefault(var.lower(), []).append(("variable", prio, var))
+        sorted_syns = sorted(SYNONYMS.keys(), key=len, reverse=True)
+        for prio, syn in enumerate(sorted_syns):
+            entries.setdefault(syn, []).append(("synonym", prio, SYNONYMS[syn]))
+        for prio, season in enumerate(SEASONS):
+            entries.setdefault(season.lower(), []).append(("season", prio, season))
+        for tok, prio, value in _RCP_TOKENS:
+            entries.setdefault(tok, []).append(("scenario_rcp", prio, value))
+        for tok, prio, value in _TIME_TOKENS:
+            entries.setdefault(tok, []).append(("scenario_time", prio, value))
+
+        # The scanner reports only the longest token at each position, so a hit also
+        # implies every shorter token that is a prefix of it (e.g. "annual precipitation"
+        # implies the season "annual").
+        self._hits = {
+            tok: tuple(e for other in entries if tok.startswith(other) for e in entries[other])
+            for tok in entries
+        }
+        self._scanner = re.compile(_trie_pattern(entries))
+        self.max_token_length = max(map(len, entries))
+
+    def scan(self, user_query_lower: str, pos: int = 0,
+             best: Optional[Dict[str, Tuple[int, str]]] = None) -> Dict[str, Tuple[int, str]]:
+        """
+        Single pass over the query. Returns {slot: (priority, value)} holding the
+        best vocabulary hit per slot (variable, synonym, season, scenario_rcp, scenario_time).
+
+        `pos` starts the pass later in the string and `best` is updated in place,
+        so a growing text can be scanned piecewise (see IncrementalIntentParser).
+        """
+        if best is None:
+            best = {}
+        hits = self._hits
+        search = self._scanner.search
+        m = search(user_query_lower, pos)
+        while m is not None:
+            for slot, prio, value in hits[m.group()]:
+                current = best.get(slot)
+                if current is None or prio < current[0]:
+                    best[slot] = (prio, value)
+            # Resume one character after the start (not the end) so overlapping tokens are still seen
+            m = search(user_query_lower, m.start() + 1)
+        return best
+
+    def parse(self, user_query_lower: str) -> Intent:
+        """
+        Analyzes the (lowercased) user query. See parse_raw_intent.
+        """
+        observer = instrumentation.observer
+        if observer is None:
+            return self.decide(user_query_lower, self.scan(user_query_lower))
+
+        start = perf_counter()
+        best = self.scan(user_query_lower)
+        intent = self.decide(user_query_lower, best)
+        observer.on_timing("parse", perf_counter() - start)
+        observer.on_event("match_branch", _match_branch(intent, best), intent)
+        observer.on_event("match_type", intent.variable_match_type, intent)
+        return intent
+
+    def decide(self, user_query_lower: str, best: Mapping[str, Tuple[int, str]]) -> Intent:
+        """
+        Builds the Intent from the scan() result for the query and the FWI / fuzzy
+        patterns, which are matched against the whole query.
+        """
+        variable = None
+        match_type = MatchType.MISSING
+        fwi_subtype = None
+
+        # --- 1. VARIABLE DETECTION ---
+
+        # FWI Special Check
+        if _FWI_RE.search(user_query_lower):
+            variable = FWI_VARIABLE
+            match_type = MatchType.EXACT # Treat FWI presence as exact intent base
+
+            # Subtypes
+            fwi_subtype = "All"
+            for subtype, subtype_re in _FWI_SUBTYPE_RES:
+                if subtype_re.search(user_query_lower):
+                    fwi_subtype = subtype
+                    break
+
+        # Exact Match (Contiguous string)
+        elif "variable" in best:
+            variable = best["variable"][1]
+            match_type = MatchType.EXACT
+
+        # Regex (Ambiguous/Fuzzy)
+        elif self._fuzzy_any.search(user_query_lower):
+            for canonical, patterns in self._fuzzy:
+                if any(pat.search(user_query_lower) for pat in patterns):
+                    variable = canonical
+                    match_type = MatchType.EXACT # Strong regex count as exact enough to skip clarifying
+                    break
+
+        # Synonym (Ambiguous)
+        elif "synonym" in best:
+            variable = best["synonym"][1]
+            match_type = MatchType.AMBIGUOUS
+
+        # --- 2. SEASON / 3. SCENARIO ---
+        season = best.get("season", _NO_HIT)[1]
+        scenario_time = best.get("scenario_time", _NO_HIT)[1]
+        scenario_rcp = best.get("scenario_rcp", _NO_HIT)[1]
+
+        return Intent(variable, match_type, season, scenario_time, scenario_rcp, fwi_subtype)
+
+
+def _match_branch(intent: Intent, best: Mapping[str, Tuple[int, str]]) -> str:
+    # Which branch of IntentMatcher.decide produced the variable
+    if intent.variable == FWI_VARIABLE:
+        return "fwi"
+    if intent.variable_match_type == MatchType.AMBIGUOUS:
+        return "synonym"
+    if intent.variable_match_type == MatchType.EXACT:
+        return "exact" if "variable" in best else "fuzzy"
+    return "none"
+
+
+_default_matcher: Optional[IntentMatcher] = None
+
+def get_default_matcher() -> IntentMatcher:
+    """
+    Returns the shared matcher built from FULL_KEY_MAP, building it on first use.
+    """
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = IntentMatcher()
+    return _default_matcher
+
+def reset_default_matcher() -> None:
+    """
+    Drops the shared matcher so the next call rebuilds it (e.g. after FULL_KEY_MAP is extended).
+    """
+    global _default_matcher
+    _default_matcher = None
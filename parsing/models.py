@@ -0,0 +1,152 @@
+import re
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+
+class MatchType:
+    """
+    Values of Intent.variable_match_type. Plain interned strings, so they compare equal
+    to (and serialize as) the strings used in the dict form.
+    """
+    MISSING = "missing"
+    EXACT = "exact"
+    AMBIGUOUS = "ambiguous"
+
+
+class Intent(NamedTuple):
+    """
+    Immutable, hashable result of parsing a query. Field order matches the dict
+    returned by parse_raw_intent; to_dict() gives that dict back.
+    """
+    variable: Optional[str] = None
+    variable_match_type: str = MatchType.MISSING
+    season: Optional[str] = None
+    scenario_time: Optional[str] = None
+    scenario_rcp: Optional[str] = None
+    fwi_subtype: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "variable": self.variable,
+            "variable_match_type": self.variable_match_type,
+            "season": self.season,
+            "scenario_time": self.scenario_time,
+            "scenario_rcp": self.scenario_rcp,
+            "fwi_subtype": self.fwi_subtype
+        }
+
+    @classmethod
+    def from_mapping(cls, intent: Mapping[str, Any]) -> "Intent":
+        """
+        Builds an Intent from a parse_raw_intent-style dict (or returns an Intent unchanged).
+        """
+        if isinstance(intent, cls):
+            return intent
+        return cls(*(intent.get(field, default) for field, default in cls._field_defaults.items()))
+
+
+class ExtractedItem(NamedTuple):
+    """
+    One value pulled from a ClimRR payload. to_dict() gives the dict used in
+    extract_relevant_data's "extracted_data".
+    """
+    variable: str
+    season: str
+    scenario: str
+    csv_key: str
+    value: Any
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "variable": self.variable,
+            "season": self.season,
+            "scenario": self.scenario,
+            "csv_key": self.csv_key,
+            "value": self.value
+        }
+
+
+class Extraction(NamedTuple):
+    """
+    Everything extract_items resolved for a query: the variable, the season used
+    (after defaults), the scenarios considered and the items found.
+    """
+    variable: Optional[str]
+    season: str
+    scenarios: Tuple[str, ...]
+    items: Tuple[ExtractedItem, ...]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The success response of extract_relevant_data. A single item is returned
+        as a dict, several (a comparison) as a list.
+        """
+        items = [item.to_dict() for item in self.items]
+        return {
+            "status": "success",
+            "intent": {
+                "variable": self.variable,
+                "season": self.season,
+                "scenario": list(self.scenarios)
+            },
+            "extracted_data": items if len(items) > 1 else items[0]
+        }
+
+
+_HISTORICAL_RE = re.compile(r"historical|past|history|baseline")
+_COMPARISON_RE = re.compile(r"compare|contrast|difference|relative|vs\b|versus")
+_FUTURE_WORDS = ("mid", "end", "project", "anticipate", "forecast")
+
+
+class ScenarioCues(NamedTuple):
+    """
+    The words in a query that decide which scenarios extraction reports. Kept apart
+    from the Intent so cues from several clarification turns can be merged.
+    """
+    rcp: Optional[str] = None
+    end_century: bool = False
+    future: bool = False
+    historical: bool = False
+    comparison: bool = False
+
+    @classmethod
+    def from_query(cls, user_query_lower: str) -> "ScenarioCues":
+        rcp = None
+        if "rcp 8.5" in user_query_lower or "8.5" in user_query_lower: rcp = "RCP8.5"
+        elif "rcp 4.5" in user_query_lower or "4.5" in user_query_lower: rcp = "RCP4.5"
+        return cls(
+            rcp,
+            "end" in user_query_lower or "2100" in user_query_lower,
+            any(word in user_query_lower for word in _FUTURE_WORDS),
+            _HISTORICAL_RE.search(user_query_lower) is not None,
+            _COMPARISON_RE.search(user_query_lower) is not None
+        )
+
+    def merge(self, later: "ScenarioCues") -> "ScenarioCues":
+        """
+        Cues of a conversation so far plus a later turn. Word cues accumulate; an RCP
+        in the later turn replaces the earlier one.
+        """
+        return ScenarioCues(
+            later.rcp or self.rcp,
+            self.end_century or later.end_century,
+            self.future or later.future,
+            self.historical or later.historical,
+            self.comparison or later.comparison
+        )
+
+    def scenarios(self) -> Tuple[str, ...]:
+        """
+        Scenario strings to extract, Historical first (Historical alone if nothing else applies).
+        """
+        time_part = "End-Century" if self.end_century else "Mid-Century"  # Default future time
+        future = None
+        if self.rcp:
+            future = f"{time_part} {self.rcp}"
+        elif self.future:
+            # Implied future from time or predictive words; RCP4.5 when no RCP was given
+            future = f"{time_part} RCP4.5"
+
+        # A comparison with a future scenario implies the historical baseline
+        if self.historical or (self.comparison and future):
+            return ("Historical", future) if future else ("Historical",)
+        return (future,) if future else ("Historical",)
@@ -0,0 +1,141 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+from .batch import parse_intents_batch
+from .matcher import IntentMatcher, get_default_matcher
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Set in each worker process by _init_worker, so the matcher is built once per process, not per chunk
+_worker_matcher: Optional[IntentMatcher] = None
+
+
+def _init_worker() -> None:
+    global _worker_matcher
+    _worker_matcher = get_default_matcher()
+
+
+def _parse_chunk(queries: List[str]) -> List[dict]:
+    return list(parse_intents_batch(queries, matcher=_worker_matcher))
+
+
+def _parse_jsonl_chunk(lines: List[Tuple[int, str]], query_field: str) -> Tuple[List[str], List[Tuple[int, str]]]:
+    # (output lines, (line number, reason) for each line skipped as not a JSON object)
+    records, skipped = [], []
+    for line_number, line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            skipped.append((line_number, f"invalid JSON: {e}"))
+            continue
+        if not isinstance(record, dict):
+            skipped.append((line_number, f"expected a JSON object, got {type(record).__name__}"))
+            continue
+        records.append(record)
+    queries = [str(record.get(query_field) or "") for record in records]
+    out = []
+    for record, intent in zip(records, parse_intents_batch(queries, matcher=_worker_matcher)):
+        record["intent"] = intent
+        out.append(json.dumps(record))
+    return out, skipped
+
+
+def _check_chunk_size(chunk_size: int) -> None:
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _ordered_map(fn, chunks: Iterable[list], workers: Optional[int], *args) -> Iterator[list]:
+    """
+    Runs fn(chunk, *args) on a process pool and yields the results in input order.
+
+    At most a few chunks per worker are in flight, so arbitrarily large inputs are
+    streamed rather than submitted all at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(fn, chunk, *args))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def replay_queries(queries: Iterable[str], workers: Optional[int] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Parses queries across worker processes, yielding parse_raw_intent(query.lower())
+    for each query in input order.
+    """
+    _check_chunk_size(chunk_size)
+    for intents in _ordered_map(_parse_chunk, _chunks(queries, chunk_size), workers):
+        yield from intents
+
+
+def replay_jsonl(input_path: str, output_path: str, query_field: str = "query",
+                 workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 skipped: Optional[List[Tuple[int, str]]] = None) -> int:
+    """
+    Reads a JSONL corpus, adds the parsed "intent" of each record's `query_field`, and writes
+    the records to `output_path` in input order. Blank lines are skipped, as are lines
+    that are not a JSON object; those are appended to `skipped` (if given) as
+    (1-based line number, reason). Returns the number of records written.
+    """
+    _check_chunk_size(chunk_size)
+    count = 0
+    with open(input_path, encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as dst:
+        lines = ((i, line) for i, line in enumerate(src, 1) if line.strip())
+        for out_lines, bad in _ordered_map(_parse_jsonl_chunk, _chunks(lines, chunk_size), workers, query_field):
+            if out_lines:
+                dst.write("\n".join(out_lines))
+                dst.write("\n")
+            count += len(out_lines)
+            if skipped is not None:
+                skipped.extend(bad)
+    return count
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Parse the intents of a JSONL query corpus on all cores.")
+    parser.add_argument("input", help="JSONL file, one record per line")
+    parser.add_argument("output", help="JSONL file to write, records in input order with an added 'intent'")
+    parser.add_argument("--field", default="query", help="record field holding the query text")
+    parser.add_argument("--workers", type=_positive_int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=_positive_int, default=DEFAULT_CHUNK_SIZE, help="records per work unit")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    skipped: List[Tuple[int, str]] = []
+    count = replay_jsonl(args.input, args.output, args.field, args.workers, args.chunk_size, skipped)
+    elapsed = time.perf_counter() - start
+    for line_number, reason in skipped:
+        print(f"{args.input}:{line_number}: skipped: {reason}", file=sys.stderr)
+    print(f"{count} records in {elapsed:.1f}s ({count / elapsed if elapsed else 0:,.0f} records/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+
+def scenario_path(scenario: str) -> Tuple[str, Optional[str]]:
+    """
+    Maps a scenario string ("Historical", "Mid-Century RCP8.5", ...) to its
+    (rcp, period) location in a ClimRR season block, e.g. ("rcp85", "mid_century").
+    Historical data lives at ("historical", None).
+    """
+    if scenario == "Historical":
+        return "historical", None
+    rcp = "rcp85" if "RCP8.5" in scenario else "rcp45"
+    tm = "end_century" if "End-Century" in scenario else "mid_century"
+    return rcp, tm
+
+
+_MISSING = object()
+
+
+class ClimrrResults:
+    """
+    Lookup index over one location's ClimRR `results` object.
+
+    Variable keys are matched case-insensitively through a case-folded key index,
+    and values are memoized in a flat (variable, season, rcp, period) -> value table.
+    Both fill in lazily: the key index only scans as far as the first matching key
+    (as the original linear scan did) and remembers every key it passed, so a one-off
+    lookup costs no more than before and every later lookup on the same payload is a
+    dict hit. Reuse one instance for as long as the payload is unchanged.
+    """
+
+    def __init__(self, results: Mapping[str, Any]):
+        self.results = results
+        self._keys: Dict[str, str] = {}
+        self._unscanned = iter(results.keys())
+        self._values: Dict[Tuple[str, str, str, Optional[str]], Any] = {}
+
+    @classmethod
+    def from_input(cls, input_data: Any) -> "ClimrrResults":
+        """
+        Wraps the `results` of the first location in an extract_relevant_data payload.
+        A first location without a `results` object is treated as empty.
+        """
+        first = input_data[0] if isinstance(input_data, list) and input_data else None
+        results = first.get('results') if isinstance(first, Mapping) else None
+        return cls(results if isinstance(results, Mapping) else {})
+
+    def resolve_key(self, json_key: str) -> Optional[str]:
+        """
+        Returns the first key in `results` equal to json_key case-insensitively, or None.
+        """
+        folded = json_key.lower()
+        actual_key = self._keys.get(folded)
+        if actual_key is not None:
+            return actual_key
+        keys = self._keys
+        for k in self._unscanned:
+            k_folded = k.lower()
+            if k_folded not in keys:
+                keys[k_folded] = k
+            if k_folded == folded:
+                return k
+        return None
+
+    def value(self, json_key: str, season: str, scenario: str) -> Any:
+        """
+        Returns the value stored for a variable, season and scenario string, or None.
+        """
+        rcp, tm = scenario_path(scenario)
+        flat_key = (json_key.lower(), season, rcp, tm)
+        val = self._values.get(flat_key, _MISSING)
+        if val is _MISSING:
+            val = self._values[flat_key] = self._lookup(json_key, season, rcp, tm)
+        return val
+
+    def _lookup(self, json_key: str, season: str, rcp: str, tm: Optional[str]) -> Any:
+        actual_key = self.resolve_key(json_key)
+        if not actual_key: return None
+
+        var_block = self.results[actual_key]
+        if season not in var_block: return None
+        season_block = var_block[season]
+
+        if tm is None:
+            if rcp in season_block and "value" in season_block[rcp]:
+                return season_block[rcp]["value"]
+        elif rcp in season_block and tm in season_block[rcp] and "value" in season_block[rcp][tm]:
+            return season_block[rcp][tm]["value"]
+        return None
@@ -0,0 +1,190 @@
+import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Hashable, Optional
+from .cache import IntentCache, normalize_query
+from .intent_processor import parse_intent, process_query_with_clarification
+from .models import Intent, MatchType, ScenarioCues
+from .results import ClimrrResults
+
+_YES = frozenset({"yes", "y", "yeah", "yep", "correct", "right", "sure"})
+_NO = frozenset({"no", "n", "nope", "nah"})
+
+
+def merge_intent(current: Intent, answer: Intent) -> Intent:
+    """
+    Fills a conversation's Intent with the slots a clarification answer provides.
+    Slots the answer mentions replace the current ones; the others are kept.
+    """
+    if answer.variable:
+        variable, match_type, fwi_subtype = answer.variable, answer.variable_match_type, answer.fwi_subtype
+    else:
+        variable, match_type, fwi_subtype = current.variable, current.variable_match_type, current.fwi_subtype
+    return Intent(
+        variable,
+        match_type,
+        answer.season or current.season,
+        answer.scenario_time or current.scenario_time,
+        answer.scenario_rcp or current.scenario_rcp,
+        fwi_subtype
+    )
+
+
+class ClarificationSession:
+    """
+    State of one conversation: the intent and scenario cues accumulated so far, the
+    number of clarification turns taken and the location payload being asked about.
+    """
+
+    def __init__(self, input_data: Any):
+        self.intent: Optional[Intent] = None
+        self.cues = ScenarioCues()
+        self.turn_count = 0
+        self.input_data = input_data
+        self.results = ClimrrResults.from_input(input_data)
+        self.last_active = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def apply(self, text: str, parsed: Intent) -> Intent:
+        """
+        Merges one user message (and its parsed Intent) into the session.
+        """
+        cues = ScenarioCues.from_query(text.lower())
+        if self.intent is None:
+            self.intent, self.cues = parsed, cues
+            return parsed
+
+        intent = self.intent
+        # A Yes/No reply to "Do you mean X?" confirms or drops the guessed variable
+        if intent.variable_match_type == MatchType.AMBIGUOUS and not parsed.variable:
+            words = normalize_query(text).replace(",", " ").split()
+            reply = words[0].strip(".!") if words else ""
+            if reply in _YES:
+                intent = intent._replace(variable_match_type=MatchType.EXACT)
+            elif reply in _NO:
+                intent = intent._replace(variable=None, variable_match_type=MatchType.MISSING, fwi_subtype=None)
+
+        self.intent = merge_intent(intent, parsed)
+        self.cues = self.cues.merge(cues)
+        return self.intent
+
+
+class ClarificationSessionManager:
+    """
+    Runs the clarification loop for many concurrent conversations on an asyncio loop.
+
+    Each conversation keeps its accumulated Intent, so an answer such as "Summer",
+    "RCP 8.5" or "Yes" is parsed on its own and merged into the open slots instead of
+    re-parsing the whole transcript. Turns of one conversation are serialized; turns of
+    different conversations run concurrently.
+
+    Parsing runs inline unless an `executor` is given, in which case it is offloaded
+    with run_in_executor (a thread pool works with an IntentCache; a process pool needs
+    cache=None). Sessions idle for `ttl` seconds are dropped, and at most
+    `max_sessions` are kept (least recently active evicted first). A session ends once
+    the loop returns data ("success" or "fallback").
+    """
+
+    def __init__(self, ttl: float = 900.0, max_sessions: Optional[int] = 100_000,
+                 executor: Optional[Executor] = None, cache: Optional[IntentCache] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if ttl <= 0:
+            raise ValueError("ttl must be positive")
+        if max_sessions is not None and max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1 (or None for no limit)")
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.executor = executor
+        self.cache = cache
+        self._clock = clock
+        self._sessions: "OrderedDict[Hashable, ClarificationSession]" = OrderedDict()
+        self.expired = 0
+        self.evicted = 0
+
+    async def _parse(self, text: str) -> Intent:
+        if self.cache is not None:
+            parse, arg = self.cache.get, text
+        else:
+            parse, arg = parse_intent, text.lower()
+        if self.executor is None:
+            return parse(arg)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, parse, arg)
+
+    def expire(self) -> int:
+        """
+        Drops sessions idle for longer than the TTL. Returns how many were dropped.
+        """
+        cutoff = self._clock() - self.ttl
+        dropped = 0
+        # Sessions are kept in order of last activity, so expired ones are at the front
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_active > cutoff:
+                break
+            del self._sessions[session_id]
+            dropped += 1
+        self.expired += dropped
+        return dropped
+
+    def _session(self, session_id: Hashable, input_data: Any) -> ClarificationSession:
+        self.expire()
+        session = self._sessions.get(session_id)
+        if session is None:
+            if input_data is None:
+                raise KeyError(f"No open session {session_id!r}; input_data is required to start one")
+            session = ClarificationSession(input_data)
+            self._sessions[session_id] = session
+            if self.max_sessions is not None and len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+        elif input_data is not None and input_data is not session.input_data:
+            session.input_data = input_data
+            session.results = ClimrrResults.from_input(input_data)
+        self._touch(session_id, session)
+        return session
+
+    def _touch(self, session_id: Hashable, session: ClarificationSession) -> None:
+        # Keeps _sessions in order of last activity, which expire() relies on
+        session.last_active = self._clock()
+        if self._sessions.get(session_id) is session:
+            self._sessions.move_to_end(session_id)
+
+    async def handle(self, session_id: Hashable, text: str, input_data: Any = None) -> Dict[str, Any]:
+        """
+        Processes one user message of a conversation and returns the same response as
+        process_query_with_clarification. `input_data` (the location's ClimRR payload)
+        is required for the first message and reused afterwards.
+        """
+        session = self._session(session_id, input_data)
+        async with session.lock:
+            parsed = await self._parse(text)
+            intent = session.apply(text, parsed)
+            response = process_query_with_clarification(
+                text, session.input_data, session.turn_count,
+                intent=intent, results=session.results, cues=session.cues
+            )
+            self._touch(session_id, session)
+            if response["status"] == "clarification_needed":
+                session.turn_count += 1
+            elif self._sessions.get(session_id) is session:
+                del self._sessions[session_id]
+        return response
+
+    def get(self, session_id: Hashable) -> Optional[ClarificationSession]:
+        """
+        The open session for a conversation, or None.
+        """
+        return self._sessions.get(session_id)
+
+    def discard(self, session_id: Hashable) -> None:
+        """
+        Ends a conversation's session, if open.
+        """
+        self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"sessions": len(self._sessions), "expired": self.expired, "evicted": self.evicted}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -1,19 +1,30 @@
+import ast
 import re
-from typing import Tuple, List, Set
+from functools import lru_cache
+from numbers import Number
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Mapping, Sequence, Set, Tuple, Union
 
 _VAR_RE = re.compile(r'\{([a-zA-Z0-9_~]+)\}')
 _EXPR_RE = re.compile(r'\{\{(.+?)\}\}|\{expr:([^}]+)\}')
 
+# Expressions are matched before plain variables, so "{{a}}" is one expression, not a variable inside braces
+_PLACEHOLDER_RE = re.compile(r'\{\{(.+?)\}\}|\{expr:([^}]+)\}|\{([a-zA-Z0-9_~]+)\}')
+
 def separate_vars_and_exprs(text: str) -> Tuple[Set[str], List[str]]:
     """
     Given combined question+answer template text, return:
     - set of variable placeholders (like "precipann_hist", "Location", "tempmax")
     - list of expression placeholders (strings to eval) if present.
-    
+
     This is intentionally conservative: it returns variables that look like simple placeholders.
     For expressions, we look for either double-curly {{ expr }} or {expr:...}.
     """
-    vars_found = set(m.group(1) for m in _VAR_RE.finditer(text))
+    vars_found, exprs = _scan_placeholders(text)
+    return set(vars_found), list(exprs)
+
+@lru_cache(maxsize=4096)
+def _scan_placeholders(text: str) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    vars_found = frozenset(m.group(1) for m in _VAR_RE.finditer(text))
     exprs = []
     for m in _EXPR_RE.finditer(text):
         g1, g2 = m.group(1), m.group(2)
@@ -21,5 +32,286 @@ def separate_vars_and_exprs(text: str) -> Tuple[Set[str], List[str]]:
             exprs.append(g1.strip())
         elif g2:
             exprs.append(g2.strip())
-    return vars_found, exprs
+    return vars_found, tuple(exprs)
+
+
+# --- Safe expression evaluation ---
+
+# Functions an expression may call; nothing else is reachable (no builtins, attributes or subscripts)
+SAFE_FUNCTIONS = {
+    "abs": abs, "round": round, "min": min, "max": max,
+    "int": int, "float": float, "str": str,
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Call, ast.keyword,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UnaryOp, ast.UAdd, ast.USub, ast.Not,
+    ast.BoolOp, ast.And, ast.Or, ast.IfExp,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)
+
+# Largest constant exponent allowed in "**"; with non-constant or nested powers an
+# expression could build numbers too large to compute or print
+MAX_EXPONENT = 100
+
+def _checked_mul(a, b):
+    # "*" on numbers only: repeating a string or list from `values` has no size bound
+    if not (isinstance(a, Number) and isinstance(b, Number)):
+        raise TypeError(f"Unsupported operand types for * in template expression: "
+                        f"{type(a).__name__!r} and {type(b).__name__!r}")
+    return a * b
+
+def _checked_mod(a, b):
+    # "%" on numbers only: printf-style formatting of a string from `values` has no size bound
+    if not (isinstance(a, Number) and isinstance(b, Number)):
+        raise TypeError(f"Unsupported operand types for % in template expression: "
+                        f"{type(a).__name__!r} and {type(b).__name__!r}")
+    return a % b
+
+# "*" and "%" are compiled to calls of these (see _GuardOperators); calls are validated
+# before the rewrite, so template text cannot call them directly
+_CHECKED_OPERATORS = {ast.Mult: "__checked_mul", ast.Mod: "__checked_mod"}
+
+_EVAL_GLOBALS = {
+    "__builtins__": {}, **SAFE_FUNCTIONS,
+    "__checked_mul": _checked_mul, "__checked_mod": _checked_mod,
+}
+
+def _may_be_str(node: ast.AST) -> bool:
+    # Whether an expression can evaluate to a string built by the template itself
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, str)
+    if isinstance(node, ast.Call):
+        return node.func.id == "str"
+    if isinstance(node, ast.IfExp):
+        return _may_be_str(node.body) or _may_be_str(node.orelse)
+    if isinstance(node, ast.BoolOp):
+        return any(_may_be_str(value) for value in node.values)
+    if isinstance(node, ast.BinOp):
+        return isinstance(node.op, ast.Add) and (_may_be_str(node.left) or _may_be_str(node.right))
+    return False
+
+def _small_exponent(node: ast.AST) -> bool:
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        node = node.operand
+    return (isinstance(node, ast.Constant) and type(node.value) in (int, float)
+            and abs(node.value) <= MAX_EXPONENT)
+
+def _check_arithmetic(node: ast.BinOp, source: str) -> None:
+    # Rejects expressions whose cost is unbounded: string repetition/formatting built
+    # from the template, and powers other than a single small constant exponent.
+    # Concatenation ("+") is bounded by the template and value sizes and is allowed.
+    if not isinstance(node.op, ast.Add) and (_may_be_str(node.left) or _may_be_str(node.right)):
+        raise ValueError(f"Unsupported string arithmetic in template expression {source!r}")
+    if isinstance(node.op, ast.Pow):
+        if not _small_exponent(node.right) or any(
+            isinstance(n, ast.BinOp) and isinstance(n.op, ast.Pow) for n in ast.walk(node.left)
+        ):
+            raise ValueError(
+                f"Unsupported power in template expression {source!r}: "
+                f"the exponent must be a constant of at most {MAX_EXPONENT}, without nested powers"
+            )
+
+class _GuardOperators(ast.NodeTransformer):
+    # Rewrites "a * b" and "a % b" into checked calls unless both operands are numeric
+    # constants, so a string or list from `values` cannot be repeated or formatted
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        name = _CHECKED_OPERATORS.get(type(node.op))
+        if name is None or all(
+            isinstance(side, ast.Constant) and isinstance(side.value, Number) for side in (node.left, node.right)
+        ):
+            return node
+        call = ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return ast.copy_location(call, node)
+
+def _parse_expression(source: str) -> ast.Expression:
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid template expression {source!r}: {e.msg}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in template expression {source!r}: {type(node).__name__}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in SAFE_FUNCTIONS):
+            raise ValueError(f"Unsupported call in template expression {source!r}")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.BinOp):
+            _check_arithmetic(node, source)
+    return ast.fix_missing_locations(_GuardOperators().visit(tree))
+
+def compile_expression(source: str):
+    """
+    Compiles a template expression after checking it only uses arithmetic,
+    comparisons, conditionals, names and calls to SAFE_FUNCTIONS, with no string
+    arithmetic other than "+" and only small constant exponents. Raises ValueError
+    for anything else. "*" and "%" raise TypeError at evaluation time unless both
+    operands are numbers.
+    """
+    return compile(_parse_expression(source), "<template expression>", "eval")
+
+
+class CompiledTemplate:
+    """
+    A template parsed once into literal, variable and expression segments.
+
+    render() fills the variable and expression slots of a prebuilt part list and joins
+    it; no regex runs at render time and expressions are precompiled code objects.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        parts: List[Any] = []
+        var_slots = []
+        expr_slots = []
+        segments = []
+        pos = 0
+        for m in _PLACEHOLDER_RE.finditer(text):
+            if m.start() > pos:
+                parts.append(text[pos:m.start()])
+                segments.append(("literal", text[pos:m.start()]))
+            expr = m.group(1) or m.group(2)
+            if expr is not None:
+                expr = expr.strip()
+                expr_slots.append((len(parts), compile_expression(expr)))
+                segments.append(("expr", expr))
+            else:
+                var_slots.append((len(parts), m.group(3)))
+                segments.append(("var", m.group(3)))
+            parts.append(None)
+            pos = m.end()
+        if pos < len(text):
+            parts.append(text[pos:])
+            segments.append(("literal", text[pos:]))
+
+        self.segments: Tuple[Tuple[str, str], ...] = tuple(segments)
+        self.variables: FrozenSet[str] = frozenset(name for _, name in var_slots)
+        self.expressions: Tuple[str, ...] = tuple(value for kind, value in segments if kind == "expr")
+        self._parts = parts
+        self._var_slots = tuple(var_slots)
+        self._expr_slots = tuple(expr_slots)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """
+        Renders the template. Variables are formatted with str(); expressions are
+        evaluated with `values` as their names. A missing variable raises KeyError.
+        """
+        parts = self._parts.copy()
+        for i, name in self._var_slots:
+            parts[i] = str(values[name])
+        for i, code in self._expr_slots:
+            parts[i] = str(eval(code, _EVAL_GLOBALS, values))
+        return "".join(parts)
+
+    def __repr__(self) -> str:
+        return f"CompiledTemplate({self.text!r})"
+
+
+@lru_cache(maxsize=4096)
+def compile_template(text: str) -> CompiledTemplate:
+    """
+    Returns the CompiledTemplate for a template text, parsing each distinct text once.
+    """
+    return CompiledTemplate(text)
+
+_templates_by_id: Dict[str, CompiledTemplate] = {}
+
+def register_template(template_id: str, text: str) -> CompiledTemplate:
+    """
+    Compiles a template and stores it under an ID for get_template().
+    """
+    template = _templates_by_id[template_id] = compile_template(text)
+    return template
+
+def get_template(template_id: str) -> CompiledTemplate:
+    """
+    Returns a template stored with register_template(). Raises KeyError for unknown IDs.
+    """
+    return _templates_by_id[template_id]
+
+
+# --- Bulk rendering over a column table ---
+
+class _ColumnExpression:
+    """
+    A template expression compiled to a function of its input columns.
+    """
+
+    def __init__(self, source: str):
+        tree = _parse_expression(source)
+        names = []
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id not in _EVAL_GLOBALS and node.id not in names:
+                names.append(node.id)
+        self.names = tuple(names)
+        # lambda <names>: <expression>, built from the validated tree (not by pasting source text)
+        arguments = ast.arguments(posonlyargs=[], args=[ast.arg(arg=name) for name in names], vararg=None,
+                                  kwonlyargs=[], kw_defaults=[], kwarg=None, defaults=[])
+        function = ast.fix_missing_locations(ast.Expression(body=ast.Lambda(args=arguments, body=tree.body)))
+        code = compile(function, "<template expression>", "eval")
+        self.row_fn: Callable = eval(code, _EVAL_GLOBALS)
+
+    def evaluate(self, columns: Sequence[Sequence[Any]]) -> List[Any]:
+        """
+        Evaluates the expression for every row.
+        """
+        return list(map(self.row_fn, *columns))
+
+@lru_cache(maxsize=1024)
+def _column_expression(source: str) -> _ColumnExpression:
+    return _ColumnExpression(source)
+
+def _as_list(column: Sequence[Any]) -> List[Any]:
+    return column.tolist() if hasattr(column, "tolist") else list(column)
+
+def render_table(template: Union[CompiledTemplate, str], table: Mapping[str, Sequence[Any]],
+                 chunk_size: int = 65536) -> Iterator[str]:
+    """
+    Renders a template once per row of a column-oriented table ({column name: values},
+    e.g. FullData.csv columns such as "precipann_hist"), yielding one string per row.
+
+    Template variables are resolved to their columns once, and each expression is
+    compiled once into a per-row function mapped over its input columns. Rows are
+    processed in chunks of `chunk_size`.
+    Output is identical to calling template.render() on each row.
+    """
+    if not isinstance(template, CompiledTemplate):
+        template = compile_template(template)
+
+    slots = []  # per placeholder, in order: (_ColumnExpression or None for a variable, input columns)
+    for kind, value in template.segments:
+        if kind == "var":
+            slots.append((None, [table[value]]))
+        elif kind == "expr":
+            expr = _column_expression(value)
+            slots.append((expr, [table[name] for name in expr.names]))
+
+    # Literals go into a format string ("{" and "}" escaped); every placeholder becomes "{}"
+    fmt = "".join(
+        "{}" if kind != "literal" else value.replace("{", "{{").replace("}", "}}")
+        for kind, value in template.segments
+    )
+    used = [column for _, columns in slots for column in columns]
+    n_rows = len(used[0]) if used else len(next(iter(table.values()), ()))
+    if not slots:
+        for _ in range(n_rows):
+            yield template.text
+        return
 
+    for start in range(0, n_rows, chunk_size):
+        stop = min(start + chunk_size, n_rows)
+        filled = []
+        converted = {}  # placeholders repeated in the template are converted once per chunk
+        for expr, columns in slots:
+            key = id(expr) if expr is not None else id(columns[0])
+            if key not in converted:
+                if expr is None:
+                    values = _as_list(columns[0][start:stop])
+                elif columns:
+                    values = expr.evaluate([column[start:stop] for column in columns])
+                else:
+                    values = [expr.row_fn()] * (stop - start)
+                converted[key] = list(map(str, values))
+            filled.append(converted[key])
+        yield from map(fmt.format, *filled)
@@ -1,9 +1,73 @@
 # climrr_intent_parser/utils/__init__.py
 
-from .constants import FULL_KEY_MAP, get_final_data_key
+# Public names are resolved lazily (PEP 562): importing the package loads no
+# submodule, and each name imports its module on first access.
+from importlib import import_module
 
-__all__ = [
-    "FULL_KEY_MAP",
-    "get_final_data_key",
-]
+TYPE_CHECKING = False  # same effect as typing.TYPE_CHECKING, without importing typing
 
+_LAZY_MODULES = {
+    ".constants": (
+        "FULL_KEY_MAP",
+        "JSON_KEY_MAP",
+        "FWI_CONFIGS",
+        "FWI_VARIABLE",
+        "get_final_data_key",
+    ),
+    ".key_index": (
+        "KeyIndex",
+        "get_key_index",
+        "available_scenarios",
+        "available_seasons",
+        "available_variables",
+        "key_for_column",
+    ),
+    ".columnar": (
+        "ColumnarStore",
+        "build_columnar_cache",
+        "load_columnar",
+        "data_columns",
+    ),
+}
+
+_EXPORTS = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is not None:
+        value = getattr(import_module(module, __name__), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .constants import (
+        FULL_KEY_MAP,
+        JSON_KEY_MAP,
+        FWI_CONFIGS,
+        FWI_VARIABLE,
+        get_final_data_key,
+    )
+    from .key_index import (
+        KeyIndex,
+        get_key_index,
+        available_scenarios,
+        available_seasons,
+        available_variables,
+        key_for_column,
+    )
+    from .columnar import (
+        ColumnarStore,
+        build_columnar_cache,
+        load_columnar,
+        data_columns,
+    )
@@ -0,0 +1,21 @@
+from typing import Any
+
+# NumPy is optional and imported on first use (see load_numpy) rather than at module
+# import, so modules that can use it stay cheap to import
+_numpy: Any = None
+_numpy_checked = False
+
+
+def load_numpy() -> Any:
+    """
+    Imports NumPy once. Returns the module, or None when it is not installed.
+    """
+    global _numpy, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+        except ImportError:
+            return None
+        _numpy = numpy
+    return _numpy
@@ -0,0 +1,308 @@
+import csv
+import json
+import math
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from .constants import FULL_KEY_MAP, FWI_CONFIGS, FWI_VARIABLE, get_final_data_key
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: concurrent builds are not serialized, see _build_lock
+    fcntl = None
+
+# ClimRR grid cell identifier column in FullData.csv
+DEFAULT_LOCATION_COLUMN = "Crossmodel"
+
+INDEX_FILE = "index.json"
+# Names the version directory readers open; replaced atomically on every build
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".lock"
+_VERSION_PREFIX = "v-"
+_TYPECODE = "d"  # float64; missing or non-numeric cells are stored as NaN
+
+
+def data_columns() -> List[str]:
+    """
+    Every FullData.csv column FULL_KEY_MAP can point to, including the FWI subtype columns.
+    """
+    columns = []
+    for (variable, _, _), column in FULL_KEY_MAP.items():
+        if variable == FWI_VARIABLE:
+            columns.extend(column + config["suffix"] for config in FWI_CONFIGS)
+        else:
+            columns.append(column)
+    return list(dict.fromkeys(columns))
+
+
+def _to_float(cell: str) -> float:
+    try:
+        return float(cell)
+    except ValueError:
+        return math.nan
+
+
+def _data_dir(cache_dir: str) -> Optional[str]:
+    # The version directory CURRENT points to, or None if the cache has not been built
+    try:
+        with open(os.path.join(cache_dir, CURRENT_FILE), encoding="utf-8") as f:
+            return os.path.join(cache_dir, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def _build_lock(cache_dir: str) -> Iterator[None]:
+    # Serializes builds of one cache across processes (flock on cache_dir/.lock), so two
+    # workers never build or clean up versions at the same time
+    os.makedirs(cache_dir, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(cache_dir, LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _build(csv_path: str, cache_dir: str, location_column: str, columns: Optional[Iterable[str]]) -> None:
+    wanted = list(columns) if columns is not None else data_columns()
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        if location_column not in header:
+            raise ValueError(f"Location column {location_column!r} not found in {csv_path}")
+        loc_idx = header.index(location_column)
+        positions = [(name, header.index(name)) for name in wanted if name in header]
+        data = {name: array(_TYPECODE) for name, _ in positions}
+        locations = []
+        for row in reader:
+            if not row:
+                continue
+            locations.append(row[loc_idx])
+            for name, idx in positions:
+                data[name].append(_to_float(row[idx]) if idx < len(row) else math.nan)
+
+    # Every build writes a new version directory; files already memory-mapped by other
+    # processes are never truncated or rewritten in place
+    version_dir = tempfile.mkdtemp(prefix=_VERSION_PREFIX, dir=cache_dir)
+    try:
+        # mkdtemp/mkstemp create owner-only entries; workers may run as other users
+        os.chmod(version_dir, 0o755)
+        for name, values in data.items():
+            with open(os.path.join(version_dir, name + ".bin"), "wb") as out:
+                values.tofile(out)
+        meta = {
+            "source": os.path.abspath(csv_path),
+            "source_mtime": os.path.getmtime(csv_path),
+            "location_column": location_column,
+            "requested_columns": wanted,
+            "rows": len(locations),
+            "typecode": _TYPECODE,
+            "byteorder": sys.byteorder,
+            "columns": list(data),
+            "locations": locations,
+        }
+        with open(os.path.join(version_dir, INDEX_FILE), "w", encoding="utf-8") as out:
+            json.dump(meta, out)
+
+        # Publish: os.replace swaps CURRENT atomically, so readers see the old or the new version
+        previous = _data_dir(cache_dir)
+        fd, pointer = tempfile.mkstemp(prefix=CURRENT_FILE + ".", dir=cache_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as out:
+            out.write(os.path.basename(version_dir))
+        os.chmod(pointer, 0o644)
+        os.replace(pointer, os.path.join(cache_dir, CURRENT_FILE))
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+
+    # Keep the version just replaced, which stores opened before this build may still
+    # need to map columns from; older versions are removed (existing maps stay valid)
+    keep = {os.path.basename(version_dir), os.path.basename(previous or "")}
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(_VERSION_PREFIX) and entry not in keep:
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+
+
+def build_columnar_cache(csv_path: str, cache_dir: str, location_column: str = DEFAULT_LOCATION_COLUMN,
+                         columns: Optional[Iterable[str]] = None) -> str:
+    """
+    Converts a ClimRR CSV into a binary columnar cache: one raw float64 file per column
+    plus index.json holding the location IDs and metadata. Only `columns` (default:
+    data_columns()) that exist in the CSV are kept. Returns cache_dir.
+
+    Each build goes into a new version directory under cache_dir and is published by
+    atomically replacing the CURRENT pointer, so processes with the previous version
+    open or mapped keep reading it unchanged. Concurrent builds of one cache_dir are
+    serialized with a file lock (POSIX only).
+    """
+    with _build_lock(cache_dir):
+        _build(csv_path, cache_dir, location_column, columns)
+    return cache_dir
+
+
+def _intent_scenario(intent: Any) -> str:
+    """
+    Scenario string for an Intent, with the same defaults extraction applies
+    (Historical; Mid-Century for an RCP alone; RCP4.5 for a future period alone).
+    """
+    time, rcp = intent.scenario_time, intent.scenario_rcp
+    if rcp:
+        return f"{time if time and time != 'Historical' else 'Mid-Century'} {rcp}"
+    if time and time != "Historical":
+        return f"{time} RCP4.5"
+    return "Historical"
+
+
+class ColumnarStore:
+    """
+    Read-only, memory-mapped view of a cache written by build_columnar_cache.
+
+    Columns are mapped on first access and returned as float64 memoryviews over the
+    file pages, so processes opening the same cache share memory without copying.
+    Wrap a column with numpy.frombuffer() for a zero-copy array. A store reads the
+    version that was current when it was opened; later rebuilds do not affect it,
+    though columns not yet mapped are only available until the version after next.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        data_dir = _data_dir(cache_dir)
+        if data_dir is None:
+            raise FileNotFoundError(f"No columnar cache in {cache_dir}; build it with build_columnar_cache")
+        self.data_dir = data_dir
+        with open(os.path.join(data_dir, INDEX_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["byteorder"] != sys.byteorder or meta["typecode"] != _TYPECODE:
+            raise ValueError(f"Columnar cache in {cache_dir} was written for a different platform; rebuild it")
+        self.meta = meta
+        self.rows: int = meta["rows"]
+        self.columns: List[str] = meta["columns"]
+        self.locations: List[str] = meta["locations"]
+        self._column_set = frozenset(self.columns)
+        self._location_index: Optional[Dict[str, int]] = None
+        self._mapped: Dict[str, memoryview] = {}
+        self._mmaps: List[mmap.mmap] = []
+
+    def row_of(self, location_id: Any) -> Optional[int]:
+        """
+        Row number of a location ID, or None.
+        """
+        if self._location_index is None:
+            self._location_index = {loc: i for i, loc in enumerate(self.locations)}
+        return self._location_index.get(str(location_id))
+
+    def column(self, name: str) -> memoryview:
+        """
+        The full column as a float64 memoryview. Raises KeyError for unknown columns.
+        """
+        view = self._mapped.get(name)
+        if view is None:
+            if name not in self._column_set:
+                raise KeyError(name)
+            if self.rows == 0:
+                view = memoryview(array(_TYPECODE))
+            else:
+                with open(os.path.join(self.data_dir, name + ".bin"), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._mmaps.append(mapped)
+                view = memoryview(mapped).cast(_TYPECODE)
+            self._mapped[name] = view
+        return view
+
+    def table(self, names: Iterable[str]) -> Dict[str, memoryview]:
+        """
+        {column name: column} for the given columns, e.g. for templater.render_table.
+        """
+        return {name: self.column(name) for name in names}
+
+    def get(self, location_id: Any, column: str) -> Optional[float]:
+        """
+        Value of one column for one location (None for unknown locations, NaN for empty cells).
+        """
+        row = self.row_of(location_id)
+        return None if row is None else self.column(column)[row]
+
+    def value(self, location_id: Any, variable: str, season: str, scenario: str,
+              suffix: str = "") -> Optional[float]:
+        """
+        Value for a (variable, season, scenario) key, via get_final_data_key. `suffix`
+        selects an FWI subtype column ("_95", "_NC", "_Avg").
+        """
+        base = get_final_data_key(variable, season, scenario)
+        if base is None or base + suffix not in self._column_set:
+            return None
+        return self.get(location_id, base + suffix)
+
+    def lookup(self, location_id: Any, intent: Any) -> Dict[str, float]:
+        """
+        {csv column: value} for a parsed Intent at one location, applying the extraction
+        defaults (Annual season, Historical scenario, every FWI subtype for "All").
+        """
+        row = self.row_of(location_id)
+        base = get_final_data_key(intent.variable, intent.season or "Annual", _intent_scenario(intent))
+        if row is None or base is None:
+            return {}
+        if intent.variable == FWI_VARIABLE:
+            configs = [c for c in FWI_CONFIGS if intent.fwi_subtype in (None, "All", c["type"])]
+            names = [base + c["suffix"] for c in configs]
+        else:
+            names = [base]
+        return {name: self.column(name)[row] for name in names if name in self._column_set}
+
+    def close(self) -> None:
+        """
+        Releases the memory maps. Views returned earlier must not be used afterwards;
+        maps still exported (e.g. to a live NumPy array) are left to the garbage collector.
+        """
+        try:
+            for view in self._mapped.values():
+                view.release()
+            for mapped in self._mmaps:
+                mapped.close()
+        except BufferError:
+            pass
+        self._mapped.clear()
+        self._mmaps.clear()
+
+
+def _built_from(meta: Dict[str, Any], csv_path: str, location_column: str) -> bool:
+    # Whether a cache was built by load_columnar from this CSV, as it is now
+    return (meta["source"] == os.path.abspath(csv_path)
+            and meta["source_mtime"] == os.path.getmtime(csv_path)
+            and meta["location_column"] == location_column
+            and meta.get("requested_columns") == data_columns())
+
+
+def load_columnar(csv_path: str, cache_dir: str, location_column: str = DEFAULT_LOCATION_COLUMN) -> ColumnarStore:
+    """
+    Opens the columnar cache for a CSV, (re)building it first if it is missing, was
+    built from another CSV, location column or column subset, or the CSV has changed
+    since. Workers calling this at the same time build it once.
+    """
+    def current() -> Optional[ColumnarStore]:
+        if _data_dir(cache_dir) is None:
+            return None
+        store = ColumnarStore(cache_dir)
+        if _built_from(store.meta, csv_path, location_column):
+            return store
+        store.close()
+        return None
+
+    store = current()
+    if store is None:
+        with _build_lock(cache_dir):
+            # Another worker may have rebuilt it while this one waited for the lock
+            store = current()
+            if store is None:
+                _build(csv_path, cache_dir, location_column, None)
+                store = ColumnarStore(cache_dir)
+    return store
@@ -107,6 +107,21 @@ FULL_KEY_MAP = {
     ("Fire Weather Index", "Autumn", "End-Century RCP8.5"): "FWIBins_EndAut",
 }
 
+FWI_VARIABLE = "Fire Weather Index"
+
+# Keys used in the ClimRR API `results` object where they differ from the FULL_KEY_MAP variable name
+JSON_KEY_MAP = {
+    "Average Maximum Temperature": "Maximum Avg Temperature",
+    "Average Minimum Temperature": "Minimum Avg Temperature"
+}
+
+# Fire Weather Index is stored as one block per subtype; the CSV column is the base key plus the suffix
+FWI_CONFIGS = [
+    {"type": "95", "json_key": "Fire Weather Index (95th Percentile)", "suffix": "_95"},
+    {"type": "Class", "json_key": "Fire Weather Index Class", "suffix": "_NC"},
+    {"type": "Average", "json_key": "Fire Weather Index (Average)", "suffix": "_Avg"}
+]
+
 def get_final_data_key(variable_name, seasonality, scenario_part) -> Optional[str]:
     """
     Translates the combination of (Variable Name, Seasonality, Scenario) into 
@@ -0,0 +1,127 @@
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+from .constants import FULL_KEY_MAP, FWI_CONFIGS, FWI_VARIABLE
+
+Key = Tuple[str, str, str]  # (variable, season, scenario)
+
+
+def _freeze(groups: Dict) -> Mapping:
+    return MappingProxyType({k: tuple(dict.fromkeys(v)) for k, v in groups.items()})
+
+
+class KeyIndex:
+    """
+    Reverse and prefix indexes over a (variable, season, scenario) -> column key map.
+
+    Built once; every lookup is a dict hit returning a tuple (in key map order) or a
+    read-only mapping, so callers cannot alter the shared index.
+    """
+
+    def __init__(self, key_map: Optional[Mapping[Key, str]] = None):
+        if key_map is None:
+            key_map = FULL_KEY_MAP
+
+        by_variable: Dict[str, List[Key]] = {}
+        by_variable_season: Dict[Tuple[str, str], List[str]] = {}
+        seasons_by_variable: Dict[str, List[str]] = {}
+        scenarios_by_variable: Dict[str, List[str]] = {}
+        by_season: Dict[str, List[str]] = {}
+        by_scenario: Dict[str, List[str]] = {}
+        by_season_scenario: Dict[Tuple[str, str], List[str]] = {}
+        columns: Dict[str, Key] = {}
+
+        for key, column in key_map.items():
+            variable, season, scenario = key
+            by_variable.setdefault(variable, []).append(key)
+            by_variable_season.setdefault((variable, season), []).append(scenario)
+            seasons_by_variable.setdefault(variable, []).append(season)
+            scenarios_by_variable.setdefault(variable, []).append(scenario)
+            by_season.setdefault(season, []).append(variable)
+            by_scenario.setdefault(scenario, []).append(variable)
+            by_season_scenario.setdefault((season, scenario), []).append(variable)
+            columns[column] = key
+            # FWI subtypes are separate CSV columns derived from the base column
+            if variable == FWI_VARIABLE:
+                for config in FWI_CONFIGS:
+                    columns[column + config["suffix"]] = key
+
+        self.by_variable = _freeze(by_variable)
+        self.by_variable_season = _freeze(by_variable_season)
+        self.seasons_by_variable = _freeze(seasons_by_variable)
+        self.scenarios_by_variable = _freeze(scenarios_by_variable)
+        self.by_season = _freeze(by_season)
+        self.by_scenario = _freeze(by_scenario)
+        self.by_season_scenario = _freeze(by_season_scenario)
+        self.columns = MappingProxyType(columns)
+        self.variables = tuple(by_variable)
+        self.seasons = tuple(by_season)
+        self.scenarios = tuple(by_scenario)
+
+    def scenarios_for(self, variable: str, season: Optional[str] = None) -> Tuple[str, ...]:
+        """
+        Scenarios available for a variable, in a given season or in any season.
+        """
+        if season is not None:
+            return self.by_variable_season.get((variable, season), ())
+        return self.scenarios_by_variable.get(variable, ())
+
+    def seasons_for(self, variable: str) -> Tuple[str, ...]:
+        """
+        Seasons available for a variable.
+        """
+        return self.seasons_by_variable.get(variable, ())
+
+    def variables_for(self, season: Optional[str] = None, scenario: Optional[str] = None) -> Tuple[str, ...]:
+        """
+        Variables with data for a season and/or scenario (all variables if neither is given).
+        """
+        if season is None and scenario is None:
+            return self.variables
+        if scenario is None:
+            return self.by_season.get(season, ())
+        if season is None:
+            return self.by_scenario.get(scenario, ())
+        return self.by_season_scenario.get((season, scenario), ())
+
+    def key_for_column(self, column: str) -> Optional[Key]:
+        """
+        The (variable, season, scenario) tuple behind a CSV column name, or None.
+        FWI subtype columns (base column + "_95" / "_NC" / "_Avg") map to their base tuple.
+        """
+        return self.columns.get(column)
+
+
+_default_index: Optional[KeyIndex] = None
+
+def get_key_index() -> KeyIndex:
+    """
+    Returns the shared KeyIndex over FULL_KEY_MAP, building it on first use.
+    """
+    global _default_index
+    if _default_index is None:
+        _default_index = KeyIndex()
+    return _default_index
+
+def available_scenarios(variable: str, season: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Scenarios in FULL_KEY_MAP for a variable (optionally restricted to one season).
+    """
+    return get_key_index().scenarios_for(variable, season)
+
+def available_seasons(variable: str) -> Tuple[str, ...]:
+    """
+    Seasons in FULL_KEY_MAP for a variable.
+    """
+    return get_key_index().seasons_for(variable)
+
+def available_variables(season: Optional[str] = None, scenario: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Variables in FULL_KEY_MAP with data for a season and/or scenario.
+    """
+    return get_key_index().variables_for(season, scenario)
+
+def key_for_column(column: str) -> Optional[Key]:
+    """
+    The FULL_KEY_MAP tuple behind a FullData.csv column name, or None.
+    """
+    return get_key_index().key_for_column(column)